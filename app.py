@@ -4,11 +4,18 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import random
+import time
+import os
+from functools import partial
 from pyFiles.deck import Deck, Card
 from pyFiles.round import Round
 from pyFiles.player import Player, ProbabilityPlayer, EvolvedPlayer, HumanPlayer
 from pyFiles.genome import Genome
-from pyFiles.simulation import prob_win, simulate_trick_outcome
+from pyFiles.probability import exact_prob_win, cached_exact_prob_win
+from pyFiles.bitboard import BitHand
+from pyFiles.profiling import RoundProfiler
+from pyFiles.runner import EvolutionRunner
+from pyFiles.tournament import GameSpec, run_tournament
 
 # Set page config
 st.set_page_config(
@@ -48,6 +55,10 @@ if 'game_history' not in st.session_state:
     st.session_state.game_history = []
 if 'random_hands' not in st.session_state:
     st.session_state.random_hands = None
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = None
+if 'evolution_runner' not in st.session_state:
+    st.session_state.evolution_runner = None
 
 # Helper functions
 def card_to_emoji(card):
@@ -89,7 +100,7 @@ def generate_random_hands(num_hands=100, hand_size=5):
         trump_suit = trump_card.suit if trump_card and trump_card.rank not in ('W', 'E') else None
         
         # Calculate probabilities
-        hand_probs = [prob_win(card, hand, trump_suit, 4, hand_size) for card in hand]
+        hand_probs = [exact_prob_win(card, hand, trump_suit, 4, hand_size) for card in hand]
         probabilities.append(hand_probs)
         expected_tricks.append(sum(hand_probs))
         
@@ -113,86 +124,18 @@ def generate_random_hands(num_hands=100, hand_size=5):
     
     return df
 
-def compare_player_types(num_games=500):
+def compare_player_types(num_games=500, profiler=None, workers=1):
     """Compare different player types across multiple games"""
-    # Player types
-    random_player = Player("Random")
-    prob_player = ProbabilityPlayer("Probability")
-    evolved_player = EvolvedPlayer("Evolved", Genome())
-    
-    players = [random_player, prob_player, evolved_player]
-    results = []
-    
-    for game_num in range(num_games):
-        # Create a new deck for each game
-        deck = Deck()
-        
-        # Randomize round number (1-10)
-        round_num = random.randint(1, 10)
-        
-        # Randomize number of players (3-6)
-        num_players = random.randint(3, 6)
-        
-        for player_type in players:
-            # Reset deck
-            deck.reset()
-            
-            # Create a game with this player type and random opponents
-            game_players = [player_type]
-            for i in range(num_players - 1):
-                game_players.append(Player(f"Opponent {i+1}"))
-            
-            # Create game
-            game = Round([p.name for p in game_players], round_num)
-            game.players = game_players
-            
-            # Deal cards
-            for p in game_players:
-                p.receive_cards(deck.deal(round_num))
-            
-            # Set trump
-            if len(deck.cards) > 0:
-                game.trump_card = deck.deal(1)[0]
-                if game.trump_card.rank not in ('W', 'E'):
-                    game.trump_suit = game.trump_card.suit
-            
-            # Play game
-            game.collect_bids()
-            game.play_tricks()
-            
-            # Record results
-            scores = game.calculate_scores()
-            
-            # Get hand composition
-            hand_composition = {
-                'Wizards': sum(1 for c in game_players[0].hand if c.rank == 'W'),
-                'Jesters': sum(1 for c in game_players[0].hand if c.rank == 'E'),
-                'Trump': sum(1 for c in game_players[0].hand if c.suit == game.trump_suit and c.rank not in ('W', 'E')),
-                'Non-Trump': sum(1 for c in game_players[0].hand if c.suit != game.trump_suit and c.rank not in ('W', 'E'))
-            }
-            
-            results.append({
-                'Game': game_num,
-                'Player Type': player_type.name,
-                'Round Number': round_num,
-                'Num Players': num_players,
-                'Bid': player_type.bid,
-                'Tricks Won': player_type.tricks_won,
-                'Score': scores[player_type.name],
-                'Hit Bid': player_type.bid == player_type.tricks_won,
-                'Wizards': hand_composition['Wizards'],
-                'Jesters': hand_composition['Jesters'],
-                'Trump Cards': hand_composition['Trump'],
-                'Non-Trump Cards': hand_composition['Non-Trump'],
-                'Trump Suit': game.trump_suit
-            })
-            
-            # Reset player
-            player_type.bid = 0
-            player_type.tricks_won = 0
-            player_type.hand = []
-    
-    return pd.DataFrame(results)
+    # Every player type plays the same rounds (3-6 players, rounds 1-10) against random opponents
+    entrants = {
+        "Random": Player,
+        "Probability": ProbabilityPlayer,
+        "Evolved": partial(EvolvedPlayer, genome=Genome()),
+    }
+    results = run_tournament(entrants, GameSpec(num_games, max_round=10), workers, profiler=profiler)
+    results = results.rename(columns={"Player": "Player Type"})
+    return results[['Game', 'Player Type', 'Round Number', 'Num Players', 'Bid', 'Tricks Won', 'Score', 'Hit Bid',
+                    'Wizards', 'Jesters', 'Trump Cards', 'Non-Trump Cards', 'Trump Suit']]
 
 def analyze_card_effectiveness():
     """Analyze the effectiveness of different card types"""
@@ -220,19 +163,19 @@ def analyze_card_effectiveness():
             for card in all_cards:
                 # Skip if card is the same suit as trump but we're checking "no trump"
                 if trump_suit is None and card.suit is not None:
-                    prob = prob_win(card, [], None, num_players, 10)
+                    prob = cached_exact_prob_win(card, [], None, num_players, 10)
                     card_type = "Regular"
                 elif card.rank == 'W':
-                    prob = prob_win(card, [], trump_suit, num_players, 10)
+                    prob = cached_exact_prob_win(card, [], trump_suit, num_players, 10)
                     card_type = "Wizard"
                 elif card.rank == 'E':
-                    prob = prob_win(card, [], trump_suit, num_players, 10)
+                    prob = cached_exact_prob_win(card, [], trump_suit, num_players, 10)
                     card_type = "Jester"
                 elif card.suit == trump_suit:
-                    prob = prob_win(card, [], trump_suit, num_players, 10)
+                    prob = cached_exact_prob_win(card, [], trump_suit, num_players, 10)
                     card_type = "Trump"
                 else:
-                    prob = prob_win(card, [], trump_suit, num_players, 10)
+                    prob = cached_exact_prob_win(card, [], trump_suit, num_players, 10)
                     card_type = "Non-Trump"
                 
                 results.append({
@@ -247,7 +190,7 @@ def analyze_card_effectiveness():
     
     return pd.DataFrame(results)
 
-def analyze_game_outcomes(num_games=1000):
+def analyze_game_outcomes(num_games=1000, profiler=None):
     """Analyze game outcomes based on different factors"""
     results = []
     
@@ -260,11 +203,12 @@ def analyze_game_outcomes(num_games=1000):
         players = [Player(f"Player {i+1}") for i in range(num_players)]
         
         # Create game
-        game = Round([p.name for p in players], round_num)
+        game = Round([p.name for p in players], round_num, profiler=profiler)
         game.players = players
         
         # Play game
         game.setup_round()
+        dealt = {player.name: BitHand(player.hand) for player in players}  # cards leave the hands during play
         game.collect_bids()
         game.play_tricks()
         
@@ -274,9 +218,9 @@ def analyze_game_outcomes(num_games=1000):
         # Record results for each player
         for player in players:
             # Calculate hand strength metrics
-            wizards = sum(1 for c in player.hand if c.rank == 'W')
-            jesters = sum(1 for c in player.hand if c.rank == 'E')
-            trump_cards = sum(1 for c in player.hand if c.suit == game.trump_suit and c.rank not in ('W', 'E'))
+            wizards = dealt[player.name].wizards
+            jesters = dealt[player.name].jesters
+            trump_cards = dealt[player.name].trumps(game.trump_suit)
             
             results.append({
                 'Round Number': round_num,
@@ -294,13 +238,13 @@ def analyze_game_outcomes(num_games=1000):
     
     return pd.DataFrame(results)
 
-def analyze_bidding_strategies():
+def analyze_bidding_strategies(profiler=None):
     """Analyze different bidding strategies"""
     # Define different bidding strategies
     strategies = {
-        "Conservative": lambda hand, trump_suit, num_players, round_num: max(0, round(sum(prob_win(c, hand, trump_suit, num_players, round_num) for c in hand) * 0.8)),
-        "Aggressive": lambda hand, trump_suit, num_players, round_num: min(round_num, round(sum(prob_win(c, hand, trump_suit, num_players, round_num) for c in hand) * 1.2)),
-        "Exact": lambda hand, trump_suit, num_players, round_num: round(sum(prob_win(c, hand, trump_suit, num_players, round_num) for c in hand)),
+        "Conservative": lambda hand, trump_suit, num_players, round_num: max(0, round(sum(exact_prob_win(c, hand, trump_suit, num_players, round_num) for c in hand) * 0.8)),
+        "Aggressive": lambda hand, trump_suit, num_players, round_num: min(round_num, round(sum(exact_prob_win(c, hand, trump_suit, num_players, round_num) for c in hand) * 1.2)),
+        "Exact": lambda hand, trump_suit, num_players, round_num: round(sum(exact_prob_win(c, hand, trump_suit, num_players, round_num) for c in hand)),
         "Zero": lambda hand, trump_suit, num_players, round_num: 0,
         "Max": lambda hand, trump_suit, num_players, round_num: round_num
     }
@@ -325,11 +269,12 @@ def analyze_bidding_strategies():
             players = [Player(f"Player {i+1}") for i in range(num_players)]
             
             # Create game
-            game = Round([p.name for p in players], round_num)
+            game = Round([p.name for p in players], round_num, profiler=profiler)
             game.players = players
             
             # Deal cards
             game.setup_round()
+            dealt = BitHand(players[0].hand)  # cards leave the hand during play
             
             # Override bid for player 0 based on strategy
             original_bid = players[0].bid
@@ -352,9 +297,9 @@ def analyze_bidding_strategies():
                 'Tricks Won': player.tricks_won,
                 'Score': scores[player.name],
                 'Hit Bid': player.bid == player.tricks_won,
-                'Wizards': sum(1 for c in player.hand if c.rank == 'W'),
-                'Jesters': sum(1 for c in player.hand if c.rank == 'E'),
-                'Trump Cards': sum(1 for c in player.hand if c.suit == game.trump_suit and c.rank not in ('W', 'E'))
+                'Wizards': dealt.wizards,
+                'Jesters': dealt.jesters,
+                'Trump Cards': dealt.trumps(game.trump_suit)
             })
     
     return pd.DataFrame(results)
@@ -362,7 +307,7 @@ def analyze_bidding_strategies():
 def calculate_probabilities(hand, trump_suit, num_players):
     probabilities = {}
     for card in hand:
-        prob = prob_win(card, hand, trump_suit, num_players, len(hand))
+        prob = cached_exact_prob_win(card, hand, trump_suit, num_players, len(hand))
         probabilities[str(card)] = prob
     return probabilities
 
@@ -419,6 +364,7 @@ def simulate_game():
     # Deal cards to other players
     for player in players[1:]:
         player.receive_cards(st.session_state.deck.deal(st.session_state.round_number))
+    game.observe_round()
     
     st.session_state.game = game
     st.session_state.players = players
@@ -473,14 +419,22 @@ Analyze card probabilities, player strategies, and game outcomes through interac
 with st.sidebar:
     st.header("Data Generation")
     
+    profile_runs = st.checkbox("Profile simulations", value=False)
+    
     if st.button("Generate All Data"):
         with st.spinner("Generating data... This may take a minute."):
-            st.session_state.player_comparison = compare_player_types(500)
+            profiler = RoundProfiler() if profile_runs else None
+            st.session_state.player_comparison = compare_player_types(500, profiler)
             st.session_state.card_analysis = analyze_card_effectiveness()
-            st.session_state.game_outcomes = analyze_game_outcomes(1000)
-            st.session_state.strategy_analysis = analyze_bidding_strategies()
+            st.session_state.game_outcomes = analyze_game_outcomes(1000, profiler)
+            st.session_state.strategy_analysis = analyze_bidding_strategies(profiler)
+            st.session_state.profiler = profiler
             st.session_state.generated_data = True
     
+    if st.session_state.profiler is not None:
+        with st.expander("Simulation Timing"):
+            st.dataframe(st.session_state.profiler.summary())
+    
     st.markdown("---")
     
     st.markdown("""
@@ -500,18 +454,22 @@ with st.sidebar:
     """)
 
 # Main content
+# Create tabs for different analyses
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    "Player Comparison", 
+    "Card Analysis", 
+    "Game Outcomes", 
+    "Bidding Strategies",
+    "Random Hand Generator",
+    "Evolution"
+])
+
+# The evolution tab below runs on its own; the other tabs need the generated data
 if not st.session_state.generated_data:
-    st.info("Click 'Generate All Data' in the sidebar to start exploring.")
+    for tab in (tab1, tab2, tab3, tab4, tab5):
+        with tab:
+            st.info("Click 'Generate All Data' in the sidebar to start exploring.")
 else:
-    # Create tabs for different analyses
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "Player Comparison", 
-        "Card Analysis", 
-        "Game Outcomes", 
-        "Bidding Strategies",
-        "Random Hand Generator"
-    ])
-    
     # Tab 1: Player Comparison
     with tab1:
         st.header("Player Type Comparison")
@@ -1038,6 +996,76 @@ else:
         else:
             st.info("Click 'Generate Hands' to create and analyze random hands.")
 
+# Tab 6: Evolution
+with tab6:
+    st.header("Genome Evolution")
+    st.markdown("""
+    Evolve genomes for the Evolved player in the background. Scores update after every
+    generation, and a run can be stopped early; the best genome found so far is kept.
+    """)
+    
+    runner = st.session_state.evolution_runner
+    running = runner is not None and runner.running
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        evolution_seed = st.number_input("Seed", min_value=0, value=0, step=1)
+    
+    with col2:
+        evolution_workers = st.number_input("Worker Processes", min_value=1, max_value=os.cpu_count() or 1, value=1)
+    
+    with col3:
+        evolution_racing = st.checkbox("Racing evaluation", value=False)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("Start Evolution", disabled=running):
+            runner = EvolutionRunner(workers=int(evolution_workers), seed=int(evolution_seed),
+                                     racing=evolution_racing).start()
+            st.session_state.evolution_runner = runner
+            running = True
+    
+    with col2:
+        if st.button("Stop Evolution", disabled=not running):
+            runner.stop()
+    
+    if runner is not None:
+        df_history, best_genome, df_genomes = runner.snapshot()
+        
+        if runner.error is not None:
+            st.error(f"Evolution failed: {runner.error}")
+        elif running:
+            status = "Stopping after this generation..." if runner.stopped else "Running..."
+            st.progress(len(df_history) / runner.num_generations,
+                        text=f"{status} {len(df_history)}/{runner.num_generations} generations")
+        else:
+            st.success(f"Finished {len(df_history)} generations")
+        
+        if not df_history.empty:
+            fig, ax = plt.subplots(figsize=(12, 6))
+            ax.plot(df_history['generation'], df_history['best_score'], marker='o', label='Best Score')
+            ax.plot(df_history['generation'], df_history['avg_score'], marker='o', label='Average Score')
+            ax.set_xlabel('Generation')
+            ax.set_ylabel('Mean Score per Game')
+            ax.set_title('Score by Generation')
+            ax.legend()
+            st.pyplot(fig)
+            
+            st.subheader("Best Genome So Far")
+            st.dataframe(pd.DataFrame(list(best_genome.items()), columns=['Gene', 'Weight']))
+            
+            with st.expander("View Top Genome per Generation"):
+                st.dataframe(df_genomes)
+        
+        # Poll the background run until it finishes
+        if running:
+            time.sleep(1)
+            st.rerun()
+    else:
+        st.info("Click 'Start Evolution' to evolve genomes in the background.")
+
 # Add footer
 st.markdown("---")
 st.markdown("Wizard Card Game Data Explorer | By Liam Brem")
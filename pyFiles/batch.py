@@ -0,0 +1,123 @@
+import numpy as np
+from pyFiles.deck import NUM_CARDS, CARD_SUIT, CARD_RANK, IS_WIZARD, IS_JESTER
+from pyFiles.trick import TRICK_STRENGTH_ARRAY, NO_SUIT_SLOT
+from pyFiles.player import Player, EvolvedPlayer
+from pyFiles.bidding import hand_features, batch_bids
+
+
+def evolved_card_values(genes):
+    # values[trump_slot, card_id] == EvolvedPlayer.evaluate_card(card, trump_suit)
+    base = (CARD_RANK + 2) / 14
+    values = np.empty((NO_SUIT_SLOT + 1, NUM_CARDS))
+    for trump in range(NO_SUIT_SLOT + 1):
+        is_trump = CARD_SUIT == trump
+        values[trump] = np.where(is_trump, base * genes["trump_weight"], base * genes["high_card_weight"])
+    values[:, IS_WIZARD] = genes["wizard_weight"]
+    values[:, IS_JESTER] = genes["jester_weight"]
+    return values
+
+
+def _policy(player):
+    if isinstance(player, EvolvedPlayer):
+        return "evolved"
+    if type(player) is Player:
+        return "random"
+    raise TypeError(f"Batch simulation has no policy for {type(player).__name__}")
+
+
+def batchable(player):
+    # Whether simulate_rounds can play this seat
+    return isinstance(player, EvolvedPlayer) or type(player) is Player
+
+
+def deal_batch(num_players, round_number, num_rounds, rng):
+    # Shuffle num_rounds decks at once; returns hands (N, P, R) and trump card ids (-1 if none)
+    order = rng.random((num_rounds, NUM_CARDS)).argsort(axis=1)
+    dealt = num_players * round_number
+    hands = order[:, :dealt].reshape(num_rounds, num_players, round_number)
+    if dealt < NUM_CARDS:
+        trump = order[:, dealt]
+    else:
+        trump = np.full(num_rounds, -1)
+    return hands, trump
+
+
+def simulate_rounds(players, round_number, num_rounds, rng=None, hands=None, trump=None):
+    """Play num_rounds independent rounds of the same table as NumPy arrays.
+
+    Mirrors Round.play_round for Player and EvolvedPlayer seats: seat 0 leads
+    the first trick, trick winners lead the next one and scores follow
+    Round.calculate_scores. Returns (num_rounds, num_players) arrays.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    num_players = len(players)
+    if num_players * round_number > NUM_CARDS:
+        raise ValueError(f"Not enough cards to deal {round_number} to {num_players} players")
+
+    if hands is None:
+        hands, trump = deal_batch(num_players, round_number, num_rounds, rng)
+    num_rounds = len(hands)
+    rows = np.arange(num_rounds)
+
+    trump_suit = np.where(trump >= 0, CARD_SUIT[np.maximum(trump, 0)], -1)
+    trump_slot = np.where(trump_suit >= 0, trump_suit, NO_SUIT_SLOT)
+
+    held = np.zeros((num_rounds, num_players, NUM_CARDS), dtype=bool)
+    held[rows[:, None, None], np.arange(num_players)[None, :, None], hands] = True
+
+    policies = [_policy(p) for p in players]
+    values = [evolved_card_values(p.genome.genes) if kind == "evolved" else None
+              for p, kind in zip(players, policies)]
+
+    # Bidding
+    bids = np.zeros((num_rounds, num_players), dtype=np.int64)
+    for seat, (player, kind) in enumerate(zip(players, policies)):
+        if kind == "random":
+            bids[:, seat] = rng.integers(0, round_number // 2 + 1, num_rounds)
+            continue
+        features = hand_features(hands[:, seat], trump, seat, num_players)
+        bids[:, seat] = batch_bids(features, player.genome.values, round_number,
+                                   bids[:, :seat].sum(axis=1), seat)[:, 0]
+
+    # Trick play
+    tricks = np.zeros((num_rounds, num_players), dtype=np.int64)
+    leader = np.zeros(num_rounds, dtype=np.int64)
+    trick_cards = np.empty((num_rounds, num_players), dtype=np.int64)
+    trick_players = np.empty((num_rounds, num_players), dtype=np.int64)
+    for _ in range(round_number):
+        lead_slot = np.full(num_rounds, NO_SUIT_SLOT)
+        for i in range(num_players):
+            actor = (leader + i) % num_players
+            hand = held[rows, actor]
+            follow = hand & (CARD_SUIT[None, :] == lead_slot[:, None])
+            legal = np.where(follow.any(axis=1)[:, None], follow, hand)
+
+            choice = np.empty(num_rounds, dtype=np.int64)
+            for seat, kind in enumerate(policies):
+                idx = np.flatnonzero(actor == seat)
+                if idx.size == 0:
+                    continue
+                seat_legal = legal[idx]
+                if kind == "random":
+                    keys = np.where(seat_legal, rng.random(seat_legal.shape), -1.0)
+                    choice[idx] = keys.argmax(axis=1)
+                else:
+                    # Defend (lowest value) once the bid is met, otherwise attack (highest)
+                    v = values[seat][trump_slot[idx]]
+                    defend = tricks[idx, seat] >= bids[idx, seat]
+                    keyed = np.where(defend[:, None], v, -v)
+                    choice[idx] = np.where(seat_legal, keyed, np.inf).argmin(axis=1)
+
+            held[rows, actor, choice] = False
+            card_suit = CARD_SUIT[choice]
+            lead_slot = np.where((lead_slot == NO_SUIT_SLOT) & (card_suit >= 0), card_suit, lead_slot)
+            trick_cards[:, i] = choice
+            trick_players[:, i] = actor
+
+        strength = TRICK_STRENGTH_ARRAY[trump_slot[:, None], lead_slot[:, None], trick_cards]
+        winner = trick_players[rows, strength.argmax(axis=1)]
+        tricks[rows, winner] += 1
+        leader = winner
+
+    scores = np.where(tricks == bids, 20 + 10 * bids, -np.abs(10 * (tricks - bids)))
+    return {"scores": scores, "bids": bids, "tricks": tricks}
@@ -0,0 +1,280 @@
+"""Throughput benchmarks for the simulation hot paths.
+
+Run from the repository root:
+
+    python -m pyFiles.benchmark --output bench.json
+    python -m pyFiles.benchmark --baseline bench_baseline.json --threshold 0.2
+    python -m pyFiles.benchmark --output bench_baseline.json --quick
+
+Every benchmark reports operations per second (rounds/sec for the round
+benchmarks, bot-games/sec for genetic.evaluate_generation) and latency
+percentiles. Compared with a baseline, a benchmark
+regresses when its throughput drops by more than the threshold.
+"""
+import argparse
+import ast
+import json
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+import numpy as np
+from pyFiles.deck import Deck
+from pyFiles.round import Round
+from pyFiles.genome import Genome
+from pyFiles.player import Player, EvolvedPlayer
+from pyFiles.simulation import simulate_trick_outcome
+from pyFiles.probability import exact_prob_win
+from pyFiles.genetic import evaluate_generation
+from pyFiles.genome import Population
+from pyFiles.batch import deal_batch
+from pyFiles.bidding import hand_features, batch_bids
+
+DEFAULT_THRESHOLD = 0.15
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+PERCENTILES = (50, 90, 99)
+
+
+def measure(fn, repeat, ops_per_call=1, warmup=1):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies)
+    total = latencies.sum()
+    result = {
+        "calls": repeat,
+        "ops_per_sec": repeat * ops_per_call / total if total > 0 else float("inf"),
+    }
+    for q in PERCENTILES:
+        result[f"p{q}_ms"] = float(np.percentile(latencies, q) * 1000)
+    return result
+
+
+def _fresh_round(players, round_number):
+    game = Round([p.name for p in players], round_number)
+    game.players = players
+    return game
+
+
+def _round_bench(players, round_number):
+    game = _fresh_round(players, round_number)
+
+    def run():
+        game.play_round()
+        for p in players:
+            p.reset()
+    return run
+
+
+def _deck_bench():
+    deck = Deck()
+
+    def run():
+        deck.reset()
+        deck.deal(10)
+    return run
+
+
+def _trick_bench():
+    deck = Deck()
+    trick = list(enumerate(deck.deal(5)))
+    lead_suit = next((c.suit for _, c in trick if c.rank not in ('W', 'E')), None)
+    return lambda: Round.resolve_trick_static(trick, lead_suit, '♠')
+
+
+def _evolved_bid_bench():
+    bot = EvolvedPlayer("Evolved", Genome())
+    deck = Deck()
+
+    def run():
+        deck.reset()
+        bot.receive_cards(deck.deal(10))
+        bot.make_bid('♠', 10, 2, 5, [3, 2])
+    return run
+
+
+def _evolved_play_bench():
+    bot = EvolvedPlayer("Evolved", Genome())
+    deck = Deck()
+
+    def run():
+        deck.reset()
+        bot.receive_cards(deck.deal(10))
+        bot.make_bid('♠', 10, 2, 5, [3, 2])
+        played = []
+        for _ in range(10):
+            played.append(bot.play_card([], None, '♠', played))
+    return run
+
+
+def _batch_bid_bench(num_hands, pop_size):
+    rng = np.random.default_rng(0)
+    hands, trump = deal_batch(5, 10, num_hands, rng)
+    population = Population.initial(pop_size)
+
+    def run():
+        features = hand_features(hands[:, 2], trump, 2, 5)
+        batch_bids(features, population.matrix, 10, np.zeros(num_hands), 2)
+    return run
+
+
+def _simulation_bench():
+    deck = Deck()
+    hand = deck.deal(8)
+    return lambda: simulate_trick_outcome(hand[0], hand, '♠', 5, 8, cache=None)  # the simulation itself
+
+
+def _exact_bench():
+    deck = Deck()
+    hand = deck.deal(8)
+    return lambda: exact_prob_win(hand[0], hand, '♠', 5, 8)
+
+
+def _generation_bench(pop_size, games_per_bot):
+    def run():
+        population = [EvolvedPlayer(f"Bot{i}", Genome()) for i in range(pop_size)]
+        evaluate_generation(population, games_per_bot=games_per_bot)
+    return run
+
+
+def build_benchmarks(quick=False):
+    scale = 0.1 if quick else 1.0
+
+    def n(count):
+        return max(3, int(count * scale))
+
+    benches = [
+        ("deck.reset_deal", _deck_bench(), n(20000), 1),
+        ("round.resolve_trick", _trick_bench(), n(50000), 1),
+        ("evolved.make_bid", _evolved_bid_bench(), n(5000), 1),
+        ("evolved.play_card", _evolved_play_bench(), n(2000), 10),
+        ("bidding.batch_bids[1000x30]", _batch_bid_bench(1000, 30), n(500), 1000 * 30),
+        ("simulation.simulate_trick_outcome", _simulation_bench(), n(2000), 1),
+        ("probability.exact_prob_win", _exact_bench(), n(50000), 1),
+    ]
+    for num_players in (3, 4, 5, 6):
+        for round_number in sorted({1, 5, 60 // num_players}):
+            players = [Player(f"Bot{i}") for i in range(num_players - 1)] + [EvolvedPlayer("Evolved", Genome())]
+            benches.append((f"round.play_round[{num_players}p,r{round_number}]",
+                            _round_bench(players, round_number), n(2000), 1))
+
+    pop_size, games_per_bot = (10, 20) if quick else (30, 200)
+    # Counted per bot-game (one bot playing one round), comparable with the rounds/sec above
+    benches.append(("genetic.evaluate_generation", _generation_bench(pop_size, games_per_bot), 3,
+                    pop_size * games_per_bot))
+    return benches
+
+
+def load_app_generators(path=APP_PATH):
+    # app.py renders the Streamlit page at import time, so only its imports
+    # and function definitions are executed here
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    tree.body = [node for node in tree.body
+                 if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))]
+    namespace = {"__name__": "app_generators"}
+    exec(compile(tree, path, "exec"), namespace)
+    return SimpleNamespace(**namespace)
+
+
+def build_app_benchmarks(quick=False):
+    try:
+        app = load_app_generators()
+    except (ImportError, OSError) as e:
+        print(f"Skipping app benchmarks: {e}", file=sys.stderr)
+        return []
+
+    games = 50 if quick else 500
+    return [
+        ("app.compare_player_types", lambda: app.compare_player_types(games), 3, games),
+        ("app.analyze_card_effectiveness", app.analyze_card_effectiveness, 3, 1),
+        ("app.analyze_game_outcomes", lambda: app.analyze_game_outcomes(games * 2), 3, games * 2),
+        ("app.analyze_bidding_strategies", app.analyze_bidding_strategies, 3, 500),
+    ]
+
+
+def run_benchmarks(quick=False, include_app=True, only=None, seed=0):
+    random.seed(seed)
+    benches = build_benchmarks(quick)
+    if include_app:
+        benches += build_app_benchmarks(quick)
+
+    results = {}
+    for name, fn, repeat, ops_per_call in benches:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = measure(fn, repeat, ops_per_call)
+        print(f"{name:<45} {results[name]['ops_per_sec']:>12.1f} ops/s   "
+              f"p50 {results[name]['p50_ms']:.3f} ms   p99 {results[name]['p99_ms']:.3f} ms")
+    return results
+
+
+def save_results(results, path):
+    payload = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # Returns one row per benchmark present in both runs
+    rows = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["ops_per_sec"]
+        ratio = current["ops_per_sec"] / before if before else float("inf")
+        rows.append({
+            "benchmark": name,
+            "baseline_ops_per_sec": before,
+            "ops_per_sec": current["ops_per_sec"],
+            "ratio": ratio,
+            "regressed": ratio < 1 - threshold,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Wizard simulation hot paths")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against results stored at this path")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed fractional throughput drop before failing (default 0.15)")
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions and smaller workloads")
+    parser.add_argument("--no-app", action="store_true", help="skip the app.py data generators")
+    parser.add_argument("--only", nargs="*", help="run benchmarks whose name contains any of these")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(quick=args.quick, include_app=not args.no_app, only=args.only)
+    if args.output:
+        save_results(results, args.output)
+
+    if args.baseline:
+        rows = compare_to_baseline(results, load_results(args.baseline), args.threshold)
+        regressions = [r for r in rows if r["regressed"]]
+        for r in rows:
+            flag = "REGRESSED" if r["regressed"] else "ok"
+            print(f"{r['benchmark']:<45} {r['ratio']:>6.2f}x  {flag}")
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
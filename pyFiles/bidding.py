@@ -0,0 +1,108 @@
+"""Vectorized EvolvedPlayer bidding over many hands and many genomes.
+
+A hand's bid only depends on how many Wizards and Jesters it holds, the
+rank histograms of its trump and non-trump cards, and its bidding
+position. hand_features turns a batch of hands into that compact feature
+matrix and feature_weights turns genomes into matching weight rows, so
+the hand-strength scores of every hand under every genome are a single
+matrix product.
+"""
+import numpy as np
+from pyFiles.deck import NUM_CARDS, CARD_SUIT, CARD_RANK, IS_WIZARD, IS_JESTER
+from pyFiles.trick import NO_SUIT_SLOT
+from pyFiles.genome import GENE_INDEX, GENE_NAMES
+
+NUM_RANKS = 13  # 2..A
+BASE_STRENGTH = (np.arange(NUM_RANKS) + 2) / 14  # EvolvedPlayer.evaluate_card's rank scale
+
+WIZARDS = 0
+JESTERS = 1
+TRUMP_RANKS = slice(2, 2 + NUM_RANKS)
+OTHER_RANKS = slice(2 + NUM_RANKS, 2 + 2 * NUM_RANKS)
+POSITION = 2 + 2 * NUM_RANKS
+BIAS = POSITION + 1
+NUM_FEATURES = BIAS + 1
+
+FEATURE_NAMES = (
+    ["wizards", "jesters"]
+    + [f"trump_{r}" for r in range(NUM_RANKS)]
+    + [f"other_{r}" for r in range(NUM_RANKS)]
+    + ["position", "bias"]
+)
+
+
+def _feature_index():
+    # FEATURE_INDEX[trump_slot, card_id] -> feature column the card counts towards
+    index = np.empty((NO_SUIT_SLOT + 1, NUM_CARDS), dtype=np.int64)
+    for trump in range(NO_SUIT_SLOT + 1):
+        index[trump] = np.where(CARD_SUIT == trump, TRUMP_RANKS.start + CARD_RANK, OTHER_RANKS.start + CARD_RANK)
+    index[:, IS_WIZARD] = WIZARDS
+    index[:, IS_JESTER] = JESTERS
+    return index
+
+
+FEATURE_INDEX = _feature_index()
+
+
+def _gene_feature_map():
+    # feature_weights(genes) == genes @ GENE_FEATURE_MAP
+    m = np.zeros((len(GENE_NAMES), NUM_FEATURES))
+    m[GENE_INDEX["wizard_weight"], WIZARDS] = 1
+    m[GENE_INDEX["jester_weight"], JESTERS] = 1
+    m[GENE_INDEX["trump_weight"], TRUMP_RANKS] = BASE_STRENGTH
+    m[GENE_INDEX["high_card_weight"], OTHER_RANKS] = BASE_STRENGTH
+    m[GENE_INDEX["position_bias"], POSITION] = 1
+    m[GENE_INDEX["risk_bias"], BIAS] = 1
+    return m
+
+
+GENE_FEATURE_MAP = _gene_feature_map()
+
+
+def trump_slots(trump):
+    # Trump card ids (-1 for none) -> suit slot, NO_SUIT_SLOT when nothing is trump
+    trump = np.asarray(trump)
+    suit = CARD_SUIT[np.maximum(trump, 0)]
+    return np.where((trump >= 0) & (suit >= 0), suit, NO_SUIT_SLOT)
+
+
+def hand_features(hands, trump, position=0, num_players=1):
+    """Feature matrix (N, NUM_FEATURES) for N hands of card ids (N, R).
+
+    trump holds each hand's trump card id (-1 for none); position and
+    num_players are the bidding position and table size, scalars or per hand.
+    """
+    hands = np.asarray(hands)
+    num_hands = len(hands)
+    columns = FEATURE_INDEX[trump_slots(trump)[:, None], hands]
+    columns = columns + (np.arange(num_hands) * NUM_FEATURES)[:, None]
+    features = np.bincount(columns.ravel(), minlength=num_hands * NUM_FEATURES)
+    features = features.reshape(num_hands, NUM_FEATURES).astype(float)
+
+    num_players = np.asarray(num_players)
+    features[:, POSITION] = np.where(num_players > 1, position / np.maximum(num_players - 1, 1), 0)
+    features[:, BIAS] = 1
+    return features
+
+
+def feature_weights(genes):
+    # (G, genes) genome matrix -> (G, NUM_FEATURES) weights
+    return np.atleast_2d(genes) @ GENE_FEATURE_MAP
+
+
+def batch_bids(features, genes, round_number, prior_bids=None, position=None):
+    """EvolvedPlayer bids for every hand under every genome, shape (N, G).
+
+    genes is a Population matrix (or one genome's values). prior_bids holds
+    the total of the bids made before each hand's seat; the over-bidding
+    penalty applies where position > 0, as in EvolvedPlayer.make_bid.
+    """
+    genes = np.atleast_2d(genes)
+    score = features @ feature_weights(genes).T
+    if prior_bids is not None:
+        excess = np.maximum(0, np.asarray(prior_bids)[:, None] + np.round(score) - round_number)
+        penalty = genes[:, GENE_INDEX["overbid_penalty_weight"]] * excess
+        if position is not None:
+            penalty = np.where((np.asarray(position) > 0)[..., None], penalty, 0)
+        score = score - penalty
+    return np.clip(np.round(score), 0, round_number).astype(np.int64)
@@ -0,0 +1,105 @@
+"""Hands as 60-bit integers, one bit per card id.
+
+Suit membership, legal-move generation, voids, removal and Wizard/Jester
+counts are all single bit operations on the precomputed masks below; Card
+objects are only built when a caller asks for them.
+"""
+from pyFiles.deck import NUM_CARDS, SUITS, CARD_SUIT, IS_WIZARD, IS_JESTER, CARDS
+from pyFiles.trick import suit_slot
+
+WIZARD_MASK = sum(1 << i for i in range(NUM_CARDS) if IS_WIZARD[i])
+JESTER_MASK = sum(1 << i for i in range(NUM_CARDS) if IS_JESTER[i])
+SPECIAL_MASK = WIZARD_MASK | JESTER_MASK
+# SUIT_MASKS[slot]: the regular cards of each suit; Wizards and Jesters under NO_SUIT_SLOT
+SUIT_MASKS = [sum(1 << i for i in range(NUM_CARDS) if CARD_SUIT[i] == s) for s in range(len(SUITS))]
+SUIT_MASKS.append(SPECIAL_MASK)
+
+
+def mask_of(cards):
+    mask = 0
+    for c in cards:
+        mask |= 1 << c.id
+    return mask
+
+
+def ids_of(mask):
+    # Set bits in ascending card id order
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def cards_of(mask):
+    return [CARDS[i] for i in ids_of(mask)]
+
+
+def legal_mask(hand, lead_suit):
+    # Same rule as Player.legal_cards: follow the lead suit with a regular card if possible
+    if lead_suit is not None:
+        follow = hand & SUIT_MASKS[suit_slot(lead_suit)]
+        if follow:
+            return follow
+    return hand
+
+
+class BitHand:
+    __slots__ = ('mask',)
+
+    def __init__(self, cards=(), mask=0):
+        self.mask = mask | mask_of(cards)
+
+    def add(self, card):
+        self.mask |= 1 << card.id
+
+    def remove(self, card):
+        bit = 1 << card.id
+        if not self.mask & bit:
+            raise ValueError(f"{card} is not in the hand")
+        self.mask ^= bit
+
+    def legal(self, lead_suit):
+        return legal_mask(self.mask, lead_suit)
+
+    def legal_cards(self, lead_suit):
+        return cards_of(self.legal(lead_suit))
+
+    def is_void(self, suit):
+        return not self.mask & SUIT_MASKS[suit_slot(suit)]
+
+    def count(self, suit):
+        # Regular cards of `suit`; NO_SUIT_SLOT counts Wizards and Jesters
+        return (self.mask & SUIT_MASKS[suit_slot(suit)]).bit_count()
+
+    @property
+    def wizards(self):
+        return (self.mask & WIZARD_MASK).bit_count()
+
+    @property
+    def jesters(self):
+        return (self.mask & JESTER_MASK).bit_count()
+
+    def trumps(self, trump_suit):
+        if trump_suit is None:
+            return 0
+        return self.count(trump_suit)
+
+    def non_trumps(self, trump_suit):
+        return (self.mask & ~SPECIAL_MASK).bit_count() - self.trumps(trump_suit)
+
+    def cards(self):
+        return cards_of(self.mask)
+
+    def __contains__(self, card):
+        return bool(self.mask >> card.id & 1)
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def __iter__(self):
+        return iter(self.cards())
+
+    def __repr__(self):
+        return f"BitHand({self.cards()})"
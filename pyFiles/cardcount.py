@@ -0,0 +1,44 @@
+from pyFiles.deck import NUM_CARDS, ALL_CARDS, CARD_SUIT
+from pyFiles.trick import NO_SUIT_SLOT
+
+CARD_SLOT = [int(s) if s >= 0 else NO_SUIT_SLOT for s in CARD_SUIT]
+
+
+class UnseenCards:
+    """The cards nobody at the table has seen yet this round.
+
+    A bitmask over card ids plus per-suit counts (Wizards and Jesters under
+    NO_SUIT_SLOT). The Round owning it removes the trump card when it is
+    turned and every card as it is played, each in O(1); players get it
+    read-only through Player.observe and subtract their own hand.
+    """
+    __slots__ = ('mask', 'count', 'suit_counts')
+
+    def __init__(self, trump_card=None):
+        self.reset(trump_card)
+
+    def reset(self, trump_card=None):
+        self.mask = ALL_CARDS
+        self.count = NUM_CARDS
+        self.suit_counts = [0] * (NO_SUIT_SLOT + 1)
+        for slot in CARD_SLOT:
+            self.suit_counts[slot] += 1
+        if trump_card is not None:
+            self.see(trump_card)
+
+    def see(self, card):
+        bit = 1 << card.id
+        if self.mask & bit:
+            self.mask ^= bit
+            self.count -= 1
+            self.suit_counts[CARD_SLOT[card.id]] -= 1
+
+    def unseen_by(self, hand_mask):
+        # Cards a player holding `hand_mask` has not seen
+        return self.mask & ~hand_mask
+
+    def __contains__(self, card):
+        return bool(self.mask >> card.id & 1)
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,55 @@
+import os
+import pickle
+import uuid
+from pathlib import Path
+
+PREFIX = "gen-"
+SUFFIX = ".pkl"
+
+
+def checkpoint_path(directory, generation):
+    return Path(directory) / f"{PREFIX}{generation:05d}{SUFFIX}"
+
+
+def save_checkpoint(directory, generation, state, keep=3):
+    # Write to a temporary file and rename, so a crash mid-write never leaves a
+    # truncated checkpoint behind; only the newest `keep` checkpoints are kept
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = checkpoint_path(directory, generation)
+    tmp = directory / f".{path.name}-{uuid.uuid4().hex}"
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    if keep:
+        for old in list_checkpoints(directory)[:-keep]:
+            old.unlink()
+    return path
+
+
+def list_checkpoints(directory):
+    # Oldest first
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.glob(f"{PREFIX}*{SUFFIX}"))
+
+
+def latest_checkpoint(directory):
+    paths = list_checkpoints(directory)
+    return paths[-1] if paths else None
+
+
+def load_checkpoint(path):
+    # A checkpoint directory loads its newest checkpoint
+    path = Path(path)
+    if path.is_dir():
+        latest = latest_checkpoint(path)
+        if latest is None:
+            raise FileNotFoundError(f"No checkpoints in {path}")
+        path = latest
+    with open(path, "rb") as f:
+        return pickle.load(f)
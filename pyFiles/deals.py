@@ -0,0 +1,48 @@
+import numpy as np
+from pyFiles.deck import NUM_CARDS, CARDS, cards_from_ids
+
+MIN_PLAYERS = 3
+MAX_PLAYERS = 6
+
+
+class Deal:
+    # One pre-dealt round: every seat's hand and the trump card as card ids,
+    # the seat the evaluated player takes, and a seed for the other seats' RNG
+
+    __slots__ = ("num_players", "round_number", "seat", "hands", "trump", "seed")
+
+    def __init__(self, num_players, round_number, seat, hands, trump, seed):
+        self.num_players = num_players
+        self.round_number = round_number
+        self.seat = seat
+        self.hands = hands
+        self.trump = trump
+        self.seed = seed
+
+    def hand_cards(self, seat):
+        return cards_from_ids(self.hands[seat])
+
+    def trump_card(self):
+        return CARDS[self.trump] if self.trump >= 0 else None
+
+    def __repr__(self):
+        return f"Deal({self.num_players}p, round {self.round_number}, seat {self.seat})"
+
+
+def generate_deals(count, rng=None, num_players=None, min_players=MIN_PLAYERS, max_players=MAX_PLAYERS,
+                   max_round=None):
+    # Random table sizes, round numbers and seats unless num_players is fixed;
+    # max_round caps the round number below what the deck allows
+    rng = rng if rng is not None else np.random.default_rng()
+    deals = []
+    for _ in range(count):
+        n = num_players if num_players is not None else int(rng.integers(min_players, max_players + 1))
+        last_round = NUM_CARDS // n if max_round is None else min(max_round, NUM_CARDS // n)
+        round_number = int(rng.integers(1, last_round + 1))
+        order = rng.permutation(NUM_CARDS)
+        dealt = n * round_number
+        hands = tuple(tuple(int(c) for c in order[seat * round_number:(seat + 1) * round_number])
+                      for seat in range(n))
+        trump = int(order[dealt]) if dealt < NUM_CARDS else -1
+        deals.append(Deal(n, round_number, int(rng.integers(n)), hands, trump, int(rng.integers(2 ** 63))))
+    return deals
@@ -1,40 +1,115 @@
-
 import random
+import numpy as np
+
+SUITS = ['♥', '♦', '♣', '♠']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A', 'W', 'E']
+NUM_CARDS = len(SUITS) * len(RANKS)  # 60 (52 regular + 4 Wizards + 4 Jesters)
+
+SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+RANK_INDEX = {rank: i for i, rank in enumerate(RANKS)}
+WIZARD_RANK = RANK_INDEX['W']
+JESTER_RANK = RANK_INDEX['E']
+NO_SUIT = -1  # suit index of Wizards and Jesters
+ALL_CARDS = (1 << NUM_CARDS) - 1  # bitmask with every card id set
+
+# Card ids follow the Deck.reset order: id = suit_index * 15 + rank_index.
+# Wizards and Jesters keep their slot in each suit block but have no suit.
+CARD_RANK = np.array([i % len(RANKS) for i in range(NUM_CARDS)], dtype=np.int8)
+CARD_SUIT = np.array([
+    NO_SUIT if i % len(RANKS) in (WIZARD_RANK, JESTER_RANK) else i // len(RANKS)
+    for i in range(NUM_CARDS)
+], dtype=np.int8)
+IS_WIZARD = CARD_RANK == WIZARD_RANK
+IS_JESTER = CARD_RANK == JESTER_RANK
+
 
 class Card:
-    def __init__(self, suit, rank):
+    __slots__ = ('suit', 'rank', 'id')
+
+    def __init__(self, suit, rank, id=None):
         self.suit = suit
         self.rank = rank
-    
+        self.id = id if id is not None else card_id(suit, rank)
+
     def __repr__(self):
         return f"{self.rank}{self.suit}"
 
+
+def card_id(suit, rank):
+    # Wizards/Jesters without a suit map to the first one in the deck.
+    # Returns None for cards outside the standard deck.
+    if rank not in RANK_INDEX:
+        return None
+    if suit in SUIT_INDEX:
+        return SUIT_INDEX[suit] * len(RANKS) + RANK_INDEX[rank]
+    if rank in ('W', 'E'):
+        return RANK_INDEX[rank]
+    return None
+
+
+# One shared Card per id; decks hand out these instead of building new objects
+CARDS = tuple(
+    Card(None if CARD_SUIT[i] == NO_SUIT else SUITS[CARD_SUIT[i]], RANKS[CARD_RANK[i]], i)
+    for i in range(NUM_CARDS)
+)
+
+
+def cards_from_ids(ids):
+    return [CARDS[i] for i in ids]
+
+
 class Deck:
-    suits = ['♥', '♦', '♣', '♠']
-    ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A', 'W', 'E']
-    
+    suits = SUITS
+    ranks = RANKS
+
     def __init__(self):
         self.cards = []
         self.reset()
-    
+
     def reset(self):
-        self.cards = []
-        for suit in self.suits:
-            for rank in self.ranks:
-                if rank not in ('W', 'E'):  # Regular cards
-                    self.cards.append(Card(suit, rank))
-                elif rank == 'W':  # Wizards (no suit)
-                    self.cards.append(Card(None, 'W'))
-                elif rank == 'E':  # Jesters (no suit)
-                    self.cards.append(Card(None, 'E'))
+        self.cards = list(CARDS)
         random.shuffle(self.cards)
-    
+
     def deal(self, count):
         if count > len(self.cards):
             raise ValueError(f"Not enough cards to deal {count}")
         dealt = self.cards[:count]
         self.cards = self.cards[count:]
         return dealt
-    
+
     def __len__(self):
         return len(self.cards)
+
+
+class ArrayDeck:
+    # Integer-encoded deck: one reusable array of card ids shuffled in place.
+    # deal() copies the dealt ids out, so hands survive the next reset();
+    # deal_cards() reads the slice straight into the shared Card objects.
+    # Without an rng, the generator is seeded from the `random` module, so
+    # random.seed() before building the deck reproduces its deals.
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng(random.getrandbits(64))
+        self.ids = np.arange(NUM_CARDS, dtype=np.int8)
+        self.position = 0
+        self.reset()
+
+    def reset(self):
+        self.rng.shuffle(self.ids)
+        self.position = 0
+
+    def _take(self, count):
+        if count > len(self):
+            raise ValueError(f"Not enough cards to deal {count}")
+        start = self.position
+        self.position += count
+        return self.ids[start:self.position]
+
+    def deal(self, count):
+        return self._take(count).copy()
+
+    def deal_cards(self, count):
+        return cards_from_ids(self._take(count).tolist())
+
+    def __len__(self):
+        return NUM_CARDS - self.position
@@ -0,0 +1,57 @@
+import math
+
+
+class FitnessCache:
+    # Running score statistics per genome, keyed by Genome.key(), so genomes
+    # that survive a generation (or are bred twice) keep their measurements.
+
+    def __init__(self):
+        self._stats = {}  # key -> [games, total, total of squares]
+
+    def add(self, key, games, total, total_sq):
+        stats = self._stats.setdefault(key, [0, 0.0, 0.0])
+        stats[0] += games
+        stats[1] += total
+        stats[2] += total_sq
+
+    def count(self, key):
+        stats = self._stats.get(key)
+        return stats[0] if stats else 0
+
+    def mean(self, key):
+        games, total, _ = self._stats[key]
+        return total / games
+
+    def variance(self, key):
+        games, total, total_sq = self._stats[key]
+        if games < 2:
+            return float("inf")
+        return max(0.0, (total_sq - total * total / games) / (games - 1))
+
+    def stderr(self, key):
+        games = self.count(key)
+        if games < 2:
+            return float("inf")
+        return math.sqrt(self.variance(key) / games)
+
+    def games_needed(self, key, target_games, target_stderr=None, min_games=20):
+        # Games still to play before the estimate for `key` is good enough:
+        # either target_games in total, or (with target_stderr) a standard
+        # error at or below it after at least min_games.
+        games = self.count(key)
+        if target_stderr is not None and games >= min_games and self.stderr(key) <= target_stderr:
+            return 0
+        return max(0, target_games - games)
+
+    def retain(self, keys):
+        # Drop statistics for genomes that are no longer in the population
+        keys = set(keys)
+        for key in list(self._stats):
+            if key not in keys:
+                del self._stats[key]
+
+    def __contains__(self, key):
+        return key in self._stats
+
+    def __len__(self):
+        return len(self._stats)
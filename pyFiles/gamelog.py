@@ -0,0 +1,159 @@
+import json
+import os
+import uuid
+from pathlib import Path
+import numpy as np
+
+# Fixed-width columns: up to 8 seats and the 20-card hands of a 3-player round
+MAX_SEATS = 8
+MAX_HAND = 20
+DEFAULT_CHUNK_SIZE = 65536
+
+COLUMNS = {
+    # name: (dtype, shape per round)
+    "seed": (np.int64, ()),
+    "index": (np.int64, ()),
+    "num_players": (np.int8, ()),
+    "round_number": (np.int8, ()),
+    "trump": (np.int8, ()),
+    "seats": (np.int32, (MAX_SEATS,)),
+    "hands": (np.int8, (MAX_SEATS, MAX_HAND)),
+    "bids": (np.int8, (MAX_SEATS,)),
+    "tricks": (np.int8, (MAX_SEATS,)),
+    "scores": (np.int16, (MAX_SEATS,)),
+}
+
+
+class GameRecorder:
+    """Streams simulated rounds to disk in fixed-size columnar chunks.
+
+    Rounds are buffered in preallocated arrays of `chunk_size` rows; a full
+    buffer is written as one chunk directory holding a .npy file per column
+    plus the player names it references. Memory use stays bounded by a
+    single chunk no matter how many rounds are recorded.
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE, prefix="part", seed=-1):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.prefix = prefix
+        self.seed = seed  # seed of the RNG stream the recorded rounds came from
+        self.rounds_recorded = 0
+        self._chunks_written = 0
+        self._names = {}
+        self._rows = 0
+        self._buffers = {
+            name: np.full((chunk_size,) + shape, -1, dtype=dtype)
+            for name, (dtype, shape) in COLUMNS.items()
+        }
+
+    def _name_id(self, name):
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names[name] = len(self._names)
+        return name_id
+
+    def record(self, players, hands, trump_card, round_number, scores):
+        # hands: card ids dealt to each seat, in seat order
+        if len(players) > MAX_SEATS:
+            raise ValueError(f"Cannot record more than {MAX_SEATS} seats")
+        b = self._buffers
+        row = self._rows
+        b["seed"][row] = self.seed
+        b["index"][row] = self.rounds_recorded
+        b["num_players"][row] = len(players)
+        b["round_number"][row] = round_number
+        b["trump"][row] = trump_card.id if trump_card is not None else -1
+        for seat, player in enumerate(players):
+            b["seats"][row, seat] = self._name_id(player.name)
+            b["hands"][row, seat, :len(hands[seat])] = hands[seat]
+            b["bids"][row, seat] = player.bid
+            b["tricks"][row, seat] = player.tricks_won
+            b["scores"][row, seat] = scores[player.name]
+
+        self._rows += 1
+        self.rounds_recorded += 1
+        if self._rows == self.chunk_size:
+            self.flush()
+
+    def record_round(self, game, hands, scores):
+        self.record(game.players, hands, game.trump_card, game.round_number, scores)
+
+    def flush(self):
+        if self._rows == 0:
+            return
+        name = f"{self.prefix}-{self._chunks_written:06d}"
+        # Write into a temporary directory and rename, so readers never see half a chunk
+        tmp = self.path / f".{name}-{uuid.uuid4().hex}"
+        tmp.mkdir()
+        for column, buffer in self._buffers.items():
+            np.save(tmp / f"{column}.npy", buffer[:self._rows])
+        with open(tmp / "names.json", "w") as f:
+            json.dump(list(self._names), f)
+        os.replace(tmp, self.path / name)
+
+        self._chunks_written += 1
+        self._rows = 0
+        for buffer in self._buffers.values():
+            buffer.fill(-1)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def spec(self, suffix, seed=-1):
+        # Arguments for a separate recorder (e.g. in a worker process) writing into the same log
+        return {"path": str(self.path), "chunk_size": self.chunk_size,
+                "prefix": f"{self.prefix}-{suffix}", "seed": seed}
+
+
+class GameLogReader:
+    # Iterates the chunks written by GameRecorder, memory-mapping the columns by default
+
+    def __init__(self, path, mmap=True):
+        self.path = Path(path)
+        self.mmap_mode = "r" if mmap else None
+
+    def chunk_paths(self):
+        return sorted(p for p in self.path.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+    def load_chunk(self, chunk_path, columns=None):
+        chunk = {
+            column: np.load(chunk_path / f"{column}.npy", mmap_mode=self.mmap_mode)
+            for column in (columns or COLUMNS)
+        }
+        with open(chunk_path / "names.json") as f:
+            chunk["names"] = json.load(f)
+        return chunk
+
+    def iter_chunks(self, columns=None):
+        for chunk_path in self.chunk_paths():
+            yield self.load_chunk(chunk_path, columns)
+
+    def iter_rounds(self):
+        # One dict per round with player names and unpadded hands
+        for chunk in self.iter_chunks():
+            names = chunk["names"]
+            for row in range(len(chunk["seed"])):
+                n = int(chunk["num_players"][row])
+                r = int(chunk["round_number"][row])
+                yield {
+                    "seed": int(chunk["seed"][row]),
+                    "index": int(chunk["index"][row]),
+                    "round_number": r,
+                    "trump": int(chunk["trump"][row]),
+                    "players": [names[i] for i in chunk["seats"][row, :n]],
+                    "hands": chunk["hands"][row, :n, :r].tolist(),
+                    "bids": chunk["bids"][row, :n].tolist(),
+                    "tricks": chunk["tricks"][row, :n].tolist(),
+                    "scores": chunk["scores"][row, :n].tolist(),
+                }
+
+    def __len__(self):
+        return sum(len(np.load(p / "seed.npy", mmap_mode="r")) for p in self.chunk_paths())
@@ -1,156 +1,447 @@
 import random
+import uuid
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from pyFiles.round import Round
-from pyFiles.genome import Genome
-from pyFiles.player import EvolvedPlayer, Player
+from pyFiles.genome import Genome, Population
+from pyFiles.player import EvolvedPlayer
+from pyFiles.profiling import RoundProfiler
+from pyFiles.table import Table
+from pyFiles.gamelog import GameRecorder
+from pyFiles.fitness import FitnessCache
+from pyFiles.deals import generate_deals, MAX_PLAYERS
+from pyFiles.checkpoint import save_checkpoint, load_checkpoint
+from pyFiles.tournament import GameSpec, run_tournament, validation_summary, bid_frequencies
 
 POP_SIZE = 30
 NUM_GENERATIONS = 50
 ELITE_COUNT = 10
 GAMES_PER_GEN = 200
+NUM_WORKERS = 1
 
 
-def evaluate_generation(population, games_per_bot=GAMES_PER_GEN):
+def play_games(population, games_per_bot, profiler=None, recorder=None):
+    # games_per_bot is one quota for every bot or a {name: games} dict.
+    # Returns each bot's total score, total squared score and games played.
+    if isinstance(games_per_bot, dict):
+        quota = games_per_bot
+    else:
+        quota = {p.name: games_per_bot for p in population}
     scores = {p.name: 0 for p in population}
+    squares = {p.name: 0 for p in population}
     appearances = {p.name: 0 for p in population}
-    game_log = []
+    table = Table(num_baselines=MAX_PLAYERS - 1, profiler=profiler, recorder=recorder)
 
-    # Flatten the player list enough times to ensure all bots participate equally
-    full_pool = []
-    while min(appearances.values()) < games_per_bot:
-        random.shuffle(population)
-        for i in range(0, len(population) - 2):
+    active = [p for p in population if quota[p.name] > 0]
+    while active:
+        random.shuffle(active)
+        for i in range(0, max(1, len(active) - 2)):
             group_size = random.randint(3, 6)
-            group = population[i:i + group_size - 2]  # 2–4 evolved
-            #group = population[i:i + group_size]
-            group += [Player(f"Baseline{j}") for j in range(2)]  # 2 fixed bots
+            # Up to 4 evolved, baseline bots in the other seats. Bots at their quota sit
+            # out, so nobody plays more games than it was asked to.
+            group = [p for p in active[i:i + group_size - 2] if appearances[p.name] < quota[p.name]]
 
-            if len(group) < 3:
+            if not group:
                 continue
 
-            round_number = random.randint(1, 60 // len(group))
-            game = Round([p.name for p in group], round_number)
-            game.players = group
-            scores_dict = game.play_round()
+            # The table size does not depend on how many bots are still active, so
+            # stragglers and lone bots play the same tables as a full population
+            round_number = random.randint(1, 60 // group_size)
+            scores_dict = table.play(group, round_number, baselines=group_size - len(group))
 
             for p in group:
-                if not p.name.startswith("Baseline"):
-                    scores[p.name] += scores_dict[p.name]
-                    appearances[p.name] += 1
-                    p.tricks_won = 0
-                    p.bid = 0
-
-            game_log.append([p.name for p in group])
+                score = scores_dict[p.name]
+                scores[p.name] += score
+                squares[p.name] += score * score
+                appearances[p.name] += 1
 
             # Stop early if all players hit their quota
-            if all(v >= games_per_bot for v in appearances.values()):
+            if all(appearances[p.name] >= quota[p.name] for p in active):
                 break
 
+        # Bots that reached their quota sit out the remaining passes
+        active = [p for p in active if appearances[p.name] < quota[p.name]]
+
+    return scores, squares, appearances
+
+
+def _play_shard(population, games_per_bot, seed, profile=False, recorder_spec=None):
+    # Runs in a worker process; each shard owns an independent RNG stream
+    random.seed(seed)
+    profiler = RoundProfiler() if profile else None
+    recorder = GameRecorder(**recorder_spec) if recorder_spec else None
+    results = play_games(population, games_per_bot, profiler, recorder)
+    if recorder is not None:
+        recorder.close()
+    return results, profiler
+
+
+def shard_seeds(seed, count):
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(count)]
+
+
+def run_games(population, games_per_bot, workers=NUM_WORKERS, seed=None, executor=None,
+              profiler=None, recorder=None):
+    # Serial by default. With workers > 1 the games are split into one shard per
+    # worker, so the same seed and worker count always give the same results.
+    if workers <= 1 or not population:
+        if seed is not None:
+            random.seed(seed)
+            if recorder is not None:
+                recorder.seed = seed
+        return play_games(population, games_per_bot, profiler, recorder)
+
+    # Quotas are split exactly, the first shards taking the remainder
+    if isinstance(games_per_bot, dict):
+        shard_quotas = [{name: games // workers + (i < games % workers) for name, games in games_per_bot.items()}
+                        for i in range(workers)]
+    else:
+        shard_quotas = [games_per_bot // workers + (i < games_per_bot % workers) for i in range(workers)]
+    seeds = shard_seeds(seed, workers)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Each shard streams its rounds into its own chunk files of the same log
+        futures = [
+            executor.submit(_play_shard, population, shard_quota, s, profiler is not None,
+                            recorder.spec(f"{s:x}", s) if recorder is not None else None)
+            for shard_quota, s in zip(shard_quotas, seeds)
+        ]
+        results = [f.result() for f in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    scores = {p.name: 0 for p in population}
+    squares = {p.name: 0 for p in population}
+    appearances = {p.name: 0 for p in population}
+    for (shard_scores, shard_squares, shard_appearances), shard_profiler in results:
+        for name in scores:
+            scores[name] += shard_scores[name]
+            squares[name] += shard_squares[name]
+            appearances[name] += shard_appearances[name]
+        if profiler is not None:
+            profiler.merge(shard_profiler)
+    return scores, squares, appearances
+
+
+def play_deals(population, deals, profiler=None, recorder=None):
+    # Common random numbers: every bot plays every pre-dealt round in the same seat
+    scores = {p.name: 0 for p in population}
+    table = Table(num_baselines=MAX_PLAYERS - 1, profiler=profiler, recorder=recorder)
+    for deal in deals:
+        for p in population:
+            scores[p.name] += table.play_deal(p, deal)[p.name]
     return scores
 
 
+def _play_deal_shard(population, deals, profile=False, recorder_spec=None):
+    profiler = RoundProfiler() if profile else None
+    recorder = GameRecorder(**recorder_spec) if recorder_spec else None
+    scores = play_deals(population, deals, profiler, recorder)
+    if recorder is not None:
+        recorder.close()
+    return scores, profiler
+
+
+def run_deals(population, deals, workers=NUM_WORKERS, executor=None, profiler=None, recorder=None):
+    # Deals carry their own seeds, so the totals do not depend on the worker count
+    if workers <= 1:
+        return play_deals(population, deals, profiler, recorder)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [
+            executor.submit(_play_deal_shard, population, deals[i::workers], profiler is not None,
+                            recorder.spec(f"deals{i}-{uuid.uuid4().hex[:8]}") if recorder is not None else None)
+            for i in range(workers)
+        ]
+        results = [f.result() for f in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    scores = {p.name: 0 for p in population}
+    for shard_scores, shard_profiler in results:
+        for name in scores:
+            scores[name] += shard_scores[name]
+        if profiler is not None:
+            profiler.merge(shard_profiler)
+    return scores
+
 
-def evolve():
-    population = [EvolvedPlayer(f"Bot{i}", Genome()) for i in range(POP_SIZE)]
-    genome_history = []
-
-    best_overall = None
-    best_score = float("-inf")
-    best_genome_data = None
-
-    # Track progress across generations
-    history = []
-
-    for gen in range(NUM_GENERATIONS):
-        scores = evaluate_generation(population)
-        population.sort(key=lambda p: scores[p.name], reverse=True)
-        elites = population[:ELITE_COUNT]
-
-        top_bot = elites[0]
-        top_score = scores[top_bot.name]
-
-        genome_log = {"generation": gen}
-        genome_log.update(top_bot.genome.genes)  # Adds each gene key-value pair
-        genome_history.append(genome_log)
-
-        #print(f"Gen {gen:>3} | Best Score: {top_score:>6.2f}")
-
-        # best overall
-        if top_score > best_score:
-            best_score = top_score
-            best_overall = top_bot
-            best_genome_data = top_bot.genome.genes.copy()
-
-        # history
-        history.append({
-            "generation": gen,
-            "best_score": top_score,
-            "avg_score": sum(scores.values()) / len(scores),
-            "best_bot": top_bot.name
-        })
-
-        # new generation
-        new_population = elites[:]
-        while len(new_population) < POP_SIZE:
-            p1, p2 = random.sample(elites, 2)
-            child_genome = p1.genome.crossover(p2.genome)
-            child_genome.mutate()
-            new_population.append(EvolvedPlayer(f"Bot{len(new_population)}", child_genome))
-
-        population = new_population
-
-    df_genomes = pd.DataFrame(genome_history)
-    df_history = pd.DataFrame(history)
-    return df_history, best_genome_data, df_genomes
-
-
-
-def validate_best_genome(genome, games=10000, num_players=5):
-    evolved_bot = EvolvedPlayer("EvolvedBot", Genome(genes=genome))
-    baseline_names = [f"Bot{i}" for i in range(num_players - 1)]
-    baseline_bots = [Player(name) for name in baseline_names]
-
-    score_total = 0
-    hit_bid_count = 0
-    bid_distribution = []
-
-    for _ in range(games):
-        players = [evolved_bot] + random.sample(baseline_bots, k=num_players - 1)
-        round_number = random.randint(1, 60 // num_players)
-        game = Round([p.name for p in players], round_number)
-        game.players = players
-        game.play_round()
-
-        for p in players:
-            if p.name == "EvolvedBot":
-                bid_distribution.append(p.bid)
-                score = 20 + 10 * p.tricks_won if p.tricks_won == p.bid else -abs(p.tricks_won - p.bid)
-                score_total += score
-                if p.tricks_won == p.bid:
-                    hit_bid_count += 1
-                p.tricks_won = 0
-                p.bid = 0
-            else:
-                p.tricks_won = 0
-                p.bid = 0
-
-    avg_score = score_total / games
-    hit_rate = hit_bid_count / games
-
-    bid_counts = pd.Series(bid_distribution).value_counts().sort_index()
-    bid_percentages = (bid_counts / len(bid_distribution) * 100).round(2)
-
-    bid_freq = pd.DataFrame({
-        "Count": bid_counts,
-        "Percent": bid_percentages.astype(str) + "%"
-})
-
-    df = pd.DataFrame({
-        "Metric": ["Avg Score", "Hit Bid %", "Games"],
-        "Value": [f"{avg_score:.2f}", f"{hit_rate:.2%}", f"{games}"]
-    })
-    
-    return df, bid_freq
+def evaluate_generation(population, games_per_bot=GAMES_PER_GEN, workers=NUM_WORKERS, seed=None, executor=None,
+                        profiler=None, recorder=None, fitness_cache=None, target_stderr=None, deals=None):
+    # Without a fitness_cache every bot plays games_per_bot games and the result
+    # is its total score. With one, each distinct genome only plays the games it
+    # still needs (see FitnessCache.games_needed) and the result is its mean
+    # score per game over every game the cache has recorded for it.
+    # With deals (see generate_deals) every bot plays exactly those rounds and
+    # the result is its mean score per deal; games_per_bot and the cache are unused.
+    if deals is not None:
+        totals = run_deals(population, deals, workers, executor, profiler, recorder)
+        return {name: total / len(deals) for name, total in totals.items()}
+
+    if fitness_cache is None:
+        scores, _, _ = run_games(population, games_per_bot, workers, seed, executor, profiler, recorder)
+        return scores
+
+    players = []
+    quota = {}
+    seen = set()
+    for p in population:
+        key = p.genome.key()
+        if key in seen:
+            continue
+        seen.add(key)
+        need = fitness_cache.games_needed(key, games_per_bot, target_stderr)
+        if need > 0:
+            players.append(p)
+            quota[p.name] = need
+
+    scores, squares, appearances = run_games(players, quota, workers, seed, executor, profiler, recorder)
+    for p in players:
+        fitness_cache.add(p.genome.key(), appearances[p.name], scores[p.name], squares[p.name])
+    return {p.name: fitness_cache.mean(p.genome.key()) for p in population}
+
+
+def race_generation(population, elite_count=ELITE_COUNT, games_per_bot=GAMES_PER_GEN, min_games=20, z=1.96,
+                    workers=NUM_WORKERS, seed=None, executor=None, profiler=None, recorder=None, fitness_cache=None):
+    """Adaptive evaluation that only spends games where they can change the elite set.
+
+    Genomes play in rounds of doubling length, from min_games up to
+    games_per_bot. After each round every genome gets a confidence interval of
+    z standard errors around its mean score. Genomes whose upper bound is below
+    the elite_count-th best lower bound cannot become elites and are dropped;
+    genomes whose lower bound is above every outsider's upper bound are
+    certain elites and stop as well. Only the genomes near the cut keep playing.
+
+    Returns each bot's mean score per game (as evaluate_generation does with a
+    fitness cache) and a report comparing the games played with fixed-budget
+    evaluation of every genome to games_per_bot.
+    """
+    fitness_cache = fitness_cache if fitness_cache is not None else FitnessCache()
+
+    candidates = {}  # genome key -> one bot playing for it
+    for p in population:
+        candidates.setdefault(p.genome.key(), p)
+    fixed_budget = sum(fitness_cache.games_needed(key, games_per_bot) for key in candidates)
+    elite_count = min(elite_count, len(candidates))
+
+    levels = []
+    level = min(min_games, games_per_bot)
+    while level < games_per_bot:
+        levels.append(level)
+        level *= 2
+    levels.append(games_per_bot)
+    round_seeds = shard_seeds(seed, len(levels)) if seed is not None else [None] * len(levels)
+
+    racing = set(candidates)
+    dropped = secured = 0
+    games_played = 0
+    for level, round_seed in zip(levels, round_seeds):
+        quota = {candidates[key].name: level - fitness_cache.count(key) for key in racing}
+        players = [candidates[key] for key in racing if quota[candidates[key].name] > 0]
+        if players:
+            scores, squares, appearances = run_games(players, quota, workers, round_seed, executor,
+                                                     profiler, recorder)
+            for p in players:
+                fitness_cache.add(p.genome.key(), appearances[p.name], scores[p.name], squares[p.name])
+                games_played += appearances[p.name]
+
+        if level == games_per_bot or len(candidates) <= elite_count:
+            break
+        lower = {key: fitness_cache.mean(key) - z * fitness_cache.stderr(key) for key in candidates}
+        upper = {key: fitness_cache.mean(key) + z * fitness_cache.stderr(key) for key in candidates}
+        cut_lower = sorted(lower.values(), reverse=True)[elite_count - 1]
+        cut_upper = sorted(upper.values(), reverse=True)[elite_count]
+        for key in list(racing):
+            if upper[key] < cut_lower:
+                racing.discard(key)
+                dropped += 1
+            elif lower[key] > cut_upper:
+                racing.discard(key)
+                secured += 1
+        if not racing:
+            break
+
+    report = {
+        "games_played": games_played,
+        "fixed_budget_games": fixed_budget,
+        "games_saved": fixed_budget - games_played,
+        "rounds": levels.index(level) + 1,
+        "dropped": dropped,
+        "secured": secured,
+    }
+    return {p.name: fitness_cache.mean(p.genome.key()) for p in population}, report
+
+
+class EvolutionState:
+    # Everything evolve() carries from one generation to the next. It is what
+    # gets pickled into checkpoints, so a resumed run continues exactly where
+    # the checkpoint left off.
+
+    def __init__(self, seed=None, target_stderr=None, common_deals=False, racing=False,
+                 num_generations=NUM_GENERATIONS, pop_size=POP_SIZE, elite_count=ELITE_COUNT,
+                 games_per_gen=GAMES_PER_GEN):
+        if racing and common_deals:
+            raise ValueError("racing and common_deals cannot be combined")
+        self.seed = seed
+        self.target_stderr = target_stderr
+        self.common_deals = common_deals
+        self.racing = racing
+        self.num_generations = num_generations
+        self.elite_count = elite_count
+        self.games_per_gen = games_per_gen
+        self.generation_seeds = shard_seeds(seed, num_generations) if seed is not None else [None] * num_generations
+
+        self.generation = 0  # next generation to evaluate
+        self.rng = np.random.default_rng(seed)
+        self.random_state = None  # state of the `random` module, captured at checkpoints
+        self.population = Population.initial(pop_size)
+        self.fitness_cache = FitnessCache()
+
+        self.best_score = float("-inf")
+        self.best_genome_data = None
+        # Track progress across generations
+        self.history = []
+        self.genome_history = []
+
+    @property
+    def done(self):
+        return self.generation >= self.num_generations
+
+    def results(self):
+        return pd.DataFrame(self.history), self.best_genome_data, pd.DataFrame(self.genome_history)
+
+
+def evolve_generation(state, workers=NUM_WORKERS, executor=None, profiler=None, recorder=None):
+    # Evaluates the current population, logs it and breeds the next one
+    gen = state.generation
+    bots = [EvolvedPlayer(f"Bot{i}", genome) for i, genome in enumerate(state.population.genomes())]
+    # evaluate_generation shuffles the list it gets, so keep bots in matrix row order
+    if state.racing:
+        scores, report = race_generation(list(bots), state.elite_count, state.games_per_gen, workers=workers,
+                                         seed=state.generation_seeds[gen], executor=executor, profiler=profiler,
+                                         recorder=recorder, fitness_cache=state.fitness_cache)
+    else:
+        deals = generate_deals(state.games_per_gen, state.rng) if state.common_deals else None
+        scores = evaluate_generation(list(bots), state.games_per_gen, workers=workers,
+                                     seed=state.generation_seeds[gen], executor=executor, profiler=profiler,
+                                     recorder=recorder, fitness_cache=state.fitness_cache,
+                                     target_stderr=state.target_stderr, deals=deals)
+    fitness = np.array([scores[bot.name] for bot in bots])
+
+    top_bot = bots[state.population.elite_indices(fitness, 1)[0]]
+    top_score = scores[top_bot.name]
+
+    genome_log = {"generation": gen}
+    genome_log.update(top_bot.genome.genes)  # Adds each gene key-value pair
+    state.genome_history.append(genome_log)
+
+    #print(f"Gen {gen:>3} | Best Score: {top_score:>6.2f}")
+
+    # best overall
+    if top_score > state.best_score:
+        state.best_score = top_score
+        state.best_genome_data = top_bot.genome.genes.copy()
+
+    # history
+    entry = {
+        "generation": gen,
+        "best_score": top_score,
+        "avg_score": sum(scores.values()) / len(scores),
+        "best_bot": top_bot.name
+    }
+    if state.racing:
+        entry["games_played"] = report["games_played"]
+        entry["games_saved"] = report["games_saved"]
+    state.history.append(entry)
+
+    # new generation: elites plus mutated crossovers of elites
+    state.population = state.population.next_generation(fitness, state.elite_count, state.rng)
+    state.fitness_cache.retain(genome.key() for genome in state.population.genomes())
+    state.generation += 1
+
+
+def iter_evolution(state, workers=NUM_WORKERS, profiler=None, recorder=None, checkpoint_dir=None, stop_event=None):
+    # Runs the remaining generations of `state`, checkpointing after each one
+    # and yielding once it is done. Stops early when stop_event is set or the
+    # generator is closed; either way the worker pool is shut down.
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while not state.done and not (stop_event is not None and stop_event.is_set()):
+            evolve_generation(state, workers, executor, profiler, recorder)
+            if checkpoint_dir is not None:
+                state.random_state = random.getstate()
+                save_checkpoint(checkpoint_dir, state.generation, state)
+            yield state
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if recorder is not None:
+            recorder.flush()
+
+
+def run_evolution(state, workers=NUM_WORKERS, profiler=None, recorder=None, checkpoint_dir=None):
+    for _ in iter_evolution(state, workers, profiler, recorder, checkpoint_dir):
+        pass
+    return state.results()
+
+
+def evolve_iter(workers=NUM_WORKERS, seed=None, profiler=None, recorder=None, target_stderr=None,
+                common_deals=False, racing=False, checkpoint_dir=None, stop_event=None):
+    # Same run as evolve(), yielding after every generation: its history row
+    # plus "top_genome" (that generation's best genes) and "best_genome" (best so far)
+    if seed is not None:
+        random.seed(seed)
+    state = EvolutionState(seed, target_stderr, common_deals, racing, NUM_GENERATIONS, POP_SIZE, ELITE_COUNT,
+                           GAMES_PER_GEN)
+    for state in iter_evolution(state, workers, profiler, recorder, checkpoint_dir, stop_event):
+        stats = dict(state.history[-1])
+        stats["top_genome"] = {k: v for k, v in state.genome_history[-1].items() if k != "generation"}
+        stats["best_genome"] = state.best_genome_data
+        yield stats
+
+
+def evolve(workers=NUM_WORKERS, seed=None, profiler=None, recorder=None, target_stderr=None, common_deals=False,
+           racing=False, checkpoint_dir=None):
+    # Pass a RoundProfiler to collect per-phase timings; read them with profiler.summary().
+    # Pass a GameRecorder to stream every simulated round to disk.
+    # Scores are mean points per game. Elites and duplicate genomes keep their
+    # measurements in a FitnessCache and only top up to GAMES_PER_GEN games
+    # (or stop early once their standard error reaches target_stderr).
+    # With common_deals every genome is scored on the same GAMES_PER_GEN deals,
+    # drawn fresh each generation, instead of on its own random games.
+    # With racing, generations are scored by race_generation, and the history
+    # records the games each one played and saved against the fixed budget.
+    # With checkpoint_dir the state is saved after every generation; continue
+    # an interrupted run with resume_evolve(checkpoint_dir).
+    if seed is not None:
+        random.seed(seed)
+    state = EvolutionState(seed, target_stderr, common_deals, racing, NUM_GENERATIONS, POP_SIZE, ELITE_COUNT,
+                           GAMES_PER_GEN)
+    return run_evolution(state, workers, profiler, recorder, checkpoint_dir)
+
+
+def resume_evolve(checkpoint_dir, workers=NUM_WORKERS, profiler=None, recorder=None):
+    # Continues from the newest checkpoint; with a seed, the results match an
+    # uninterrupted run. Give a new recorder its own prefix so chunk names do not clash.
+    state = load_checkpoint(checkpoint_dir)
+    random.setstate(state.random_state)
+    return run_evolution(state, workers, profiler, recorder, checkpoint_dir)
+
+
+def validate_best_genome(genome, games=10000, num_players=5, deals=None, workers=NUM_WORKERS, seed=None):
+    # Pass deals (all for num_players) to score on the same rounds as another validation
+    spec = GameSpec(games, num_players, seed=seed, deals=deals)
+    results = run_tournament({"EvolvedBot": partial(EvolvedPlayer, genome=Genome(genes=genome))}, spec, workers)
+    return validation_summary(results, "EvolvedBot"), bid_frequencies(results, "EvolvedBot")
 
 
 
@@ -1,12 +1,119 @@
+from collections.abc import MutableMapping
+import numpy as np
+
+# Fixed gene order; a genome is one row of floats in this order
+GENE_NAMES = (
+    "wizard_weight",
+    "jester_weight",
+    "trump_weight",
+    "high_card_weight",
+    "risk_bias",
+    "position_bias",
+    "overbid_penalty_weight",
+)
+GENE_INDEX = {name: i for i, name in enumerate(GENE_NAMES)}
+DEFAULT_GENES = np.array([0.95, 0.05, 1.5, 1.0, 0.0, 0.1, 0.2])
+
+MUTATION_RATE = 0.2   # chance that each gene of a child is perturbed
+MUTATION_SCALE = 0.1  # standard deviation of the perturbation
+
+
+class GeneView(MutableMapping):
+    # Dict-style access (genes["trump_weight"]) onto a genome's value array
+
+    def __init__(self, values):
+        self._values = values
+
+    def __getitem__(self, name):
+        return float(self._values[GENE_INDEX[name]])
+
+    def __setitem__(self, name, value):
+        self._values[GENE_INDEX[name]] = value
+
+    def __delitem__(self, name):
+        raise TypeError("Genes cannot be removed from a genome")
+
+    def __contains__(self, name):
+        return name in GENE_INDEX
+
+    def __iter__(self):
+        return iter(GENE_NAMES)
+
+    def __len__(self):
+        return len(GENE_NAMES)
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
 
 class Genome:
-    def __init__(self, genes=None):
-        self.genes = genes or {
-            "wizard_weight": 0.95,
-            "jester_weight": 0.05,
-            "trump_weight": 1.5,
-            "high_card_weight": 1.0,
-            "risk_bias": 0.0,
-            "position_bias": 0.1,
-            "overbid_penalty_weight": 0.2
-        }
+    def __init__(self, genes=None, values=None):
+        if values is not None:
+            # May be a row view into a Population matrix
+            self.values = values
+        else:
+            self.values = DEFAULT_GENES.copy()
+            for name, value in (genes or {}).items():
+                self.values[GENE_INDEX[name]] = value
+        self.genes = GeneView(self.values)
+
+    def key(self):
+        # Identifies genomes with identical weights
+        return self.values.tobytes()
+
+    def crossover(self, other, rng=None):
+        # Uniform crossover: each gene comes from either parent with equal chance
+        rng = rng if rng is not None else np.random.default_rng()
+        mask = rng.random(len(GENE_NAMES)) < 0.5
+        return Genome(values=np.where(mask, self.values, other.values))
+
+    def mutate(self, rate=MUTATION_RATE, scale=MUTATION_SCALE, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        hit = rng.random(len(GENE_NAMES)) < rate
+        self.values += hit * rng.normal(0, scale, len(GENE_NAMES))
+        return self
+
+
+class Population:
+    """All genomes of a generation as one (size, genes) matrix.
+
+    Selection, crossover and mutation work on the whole matrix at once;
+    genome(i) returns a Genome viewing row i.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=float)
+
+    @classmethod
+    def initial(cls, size, genes=None):
+        return cls(np.tile(Genome(genes).values, (size, 1)))
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def genome(self, i):
+        return Genome(values=self.matrix[i])
+
+    def genomes(self):
+        return [self.genome(i) for i in range(len(self))]
+
+    def elite_indices(self, fitness, count):
+        # Best first; ties keep population order
+        return np.argsort(-np.asarray(fitness), kind="stable")[:count]
+
+    def next_generation(self, fitness, elite_count, rng, rate=MUTATION_RATE, scale=MUTATION_SCALE):
+        # Elites survive unchanged; the rest are mutated uniform crossovers of two distinct elites
+        elites = self.matrix[self.elite_indices(fitness, elite_count)]
+        num_children = len(self) - len(elites)
+        genes = self.matrix.shape[1]
+
+        parents = rng.random((num_children, len(elites))).argsort(axis=1)[:, :2]
+        mask = rng.random((num_children, genes)) < 0.5
+        children = np.where(mask, elites[parents[:, 0]], elites[parents[:, 1]])
+        hit = rng.random((num_children, genes)) < rate
+        children += hit * rng.normal(0, scale, (num_children, genes))
+
+        return Population(np.vstack([elites, children]))
@@ -0,0 +1,197 @@
+"""Island-model evolution: several populations evolving in parallel.
+
+Each island is an EvolutionState in its own process. Every
+`migration_interval` generations the islands send their top genomes to the
+islands named by the migration topology, where they replace the newest,
+not yet evaluated children (the elites are kept). Islands talk to the
+coordinator over multiprocessing.connection, so they can be local processes
+or workers on other hosts:
+
+    # coordinator, waiting for 8 islands on port 6000
+    evolve_islands(8, address=("0.0.0.0", 6000), authkey=b"secret", spawn_local=False)
+
+    # on each worker host
+    python -m pyFiles.islands coordinator-host:6000 --authkey secret
+"""
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Process
+from multiprocessing.connection import Client, Listener
+import numpy as np
+import pandas as pd
+from pyFiles.genetic import (EvolutionState, evolve_generation, shard_seeds, NUM_GENERATIONS, POP_SIZE,
+                             ELITE_COUNT, GAMES_PER_GEN)
+
+MIGRATION_INTERVAL = 5
+MIGRANTS = 2
+
+
+def migration_targets(topology, num_islands):
+    # island -> islands its emigrants go to. topology is "ring", "all", "none",
+    # a {source: [destinations]} dict or a callable(island, num_islands) -> destinations.
+    if callable(topology):
+        return {i: list(topology(i, num_islands)) for i in range(num_islands)}
+    if isinstance(topology, dict):
+        return {i: list(topology.get(i, [])) for i in range(num_islands)}
+    if topology == "ring":
+        return {i: [(i + 1) % num_islands] if num_islands > 1 else [] for i in range(num_islands)}
+    if topology == "all":
+        return {i: [j for j in range(num_islands) if j != i] for i in range(num_islands)}
+    if topology == "none":
+        return {i: [] for i in range(num_islands)}
+    raise ValueError(f"Unknown migration topology: {topology!r}")
+
+
+def receive_migrants(state, migrants):
+    # Immigrants replace the last (newest, not yet evaluated) children; elites are kept
+    matrix = state.population.matrix
+    count = min(len(migrants), len(matrix) - state.elite_count)
+    if count <= 0:
+        return
+    matrix[len(matrix) - count:] = migrants[:count]
+    state.fitness_cache.retain(genome.key() for genome in state.population.genomes())
+
+
+def island_worker(address, authkey):
+    # Serves one island until the coordinator sends "finish"
+    with Client(address, authkey=authkey) as conn:
+        _, (index, seed, settings, workers) = conn.recv()
+        if seed is not None:
+            random.seed(seed)
+        state = EvolutionState(seed, **settings)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while True:
+                command, payload = conn.recv()
+                if command == "evolve":
+                    generations, migrants = payload
+                    for _ in range(generations):
+                        if state.done:
+                            break
+                        evolve_generation(state, workers, executor)
+                    # next_generation puts the elites first, best first
+                    conn.send(state.population.matrix[:migrants].copy())
+                elif command == "immigrate":
+                    receive_migrants(state, payload)
+                elif command == "finish":
+                    conn.send((index, (state.history, state.genome_history, state.best_score,
+                                       state.best_genome_data)))
+                    break
+                else:
+                    raise ValueError(f"Unknown island command: {command!r}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+
+def merge_island_results(results):
+    # Per generation, the best island's top bot stands for the whole archipelago
+    history = []
+    genome_history = []
+    for gen in range(min(len(r[0]) for r in results)):
+        entries = [r[0][gen] for r in results]
+        best = max(range(len(results)), key=lambda i: entries[i]["best_score"])
+        entry = dict(entries[best])
+        entry["best_bot"] = f"Island{best}.{entry['best_bot']}"
+        entry["avg_score"] = sum(e["avg_score"] for e in entries) / len(entries)
+        for column in ("games_played", "games_saved"):
+            if column in entry:
+                entry[column] = sum(e[column] for e in entries)
+        history.append(entry)
+        genome_history.append(results[best][1][gen])
+
+    best_island = max(range(len(results)), key=lambda i: results[i][2])
+    return pd.DataFrame(history), results[best_island][3], pd.DataFrame(genome_history)
+
+
+def evolve_islands(num_islands=4, migration_interval=MIGRATION_INTERVAL, migrants=MIGRANTS, topology="ring",
+                   seed=None, workers_per_island=1, address=("localhost", 0), authkey=None, spawn_local=True,
+                   target_stderr=None, common_deals=False, racing=False):
+    # Returns (df_history, best_genome_data, df_genomes) like evolve().
+    # With spawn_local the islands run as processes on this machine; otherwise
+    # the coordinator waits at `address` (a (host, port) pair or a local socket
+    # path) for num_islands workers started with island_worker / the CLI.
+    if authkey is None:
+        if not spawn_local:
+            raise ValueError("Remote islands need a shared authkey")
+        authkey = os.urandom(16)
+    settings = {
+        "target_stderr": target_stderr,
+        "common_deals": common_deals,
+        "racing": racing,
+        "num_generations": NUM_GENERATIONS,
+        "pop_size": POP_SIZE,
+        "elite_count": ELITE_COUNT,
+        "games_per_gen": GAMES_PER_GEN,
+    }
+    targets = migration_targets(topology, num_islands)
+    # Island i always evolves from seeds[i], whichever worker process happens to serve it
+    seeds = shard_seeds(seed, num_islands) if seed is not None else [None] * num_islands
+
+    processes = []
+    with Listener(address, authkey=authkey) as listener:
+        if spawn_local:
+            processes = [Process(target=island_worker, args=(listener.address, authkey))
+                         for _ in range(num_islands)]
+            for process in processes:
+                process.start()
+        conns = [listener.accept() for _ in range(num_islands)]
+
+    try:
+        # Connections are assigned island indices in the order they arrive; the
+        # index, not the connection, fixes an island's seed and topology position
+        for index, conn in enumerate(conns):
+            conn.send(("init", (index, seeds[index], settings, workers_per_island)))
+
+        done = 0
+        while done < NUM_GENERATIONS:
+            generations = min(migration_interval, NUM_GENERATIONS - done)
+            for conn in conns:
+                conn.send(("evolve", (generations, migrants)))
+            emigrants = [conn.recv() for conn in conns]
+            done += generations
+
+            if done < NUM_GENERATIONS and migrants:
+                incoming = {i: [] for i in range(num_islands)}
+                for source, destinations in targets.items():
+                    for destination in destinations:
+                        incoming[destination].append(emigrants[source])
+                for i, conn in enumerate(conns):
+                    if incoming[i]:
+                        conn.send(("immigrate", np.vstack(incoming[i])))
+
+        for conn in conns:
+            conn.send(("finish", None))
+        results = [None] * num_islands
+        for conn in conns:
+            index, result = conn.recv()
+            results[index] = result
+    finally:
+        for conn in conns:
+            conn.close()
+        for process in processes:
+            process.join()
+
+    return merge_island_results(results)
+
+
+def parse_address(text):
+    # "host:port" for TCP, anything else is a local socket path
+    host, sep, port = text.rpartition(":")
+    if sep and port.isdigit():
+        return host, int(port)
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one island of a distributed evolution")
+    parser.add_argument("address", help="coordinator host:port or local socket path")
+    parser.add_argument("--authkey", required=True, help="shared key the coordinator was started with")
+    args = parser.parse_args(argv)
+    island_worker(parse_address(args.address), args.authkey.encode())
+
+
+if __name__ == "__main__":
+    main()
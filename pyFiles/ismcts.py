@@ -0,0 +1,345 @@
+"""Information-set Monte Carlo tree search for trick play.
+
+ISMCTSPlayer bids like ProbabilityPlayer but chooses cards by searching a
+single-observer ISMCTS tree. Every iteration deals the cards it cannot see
+to the other seats (respecting the suits they have shown to be void in),
+walks the tree with UCB among the moves legal in that deal, expands one
+node and finishes the round with random playouts. Nodes keep each mover's
+own normalized score, so opponents chase their bids as well.
+
+Searches are anytime: they stop at a per-decision millisecond budget. The
+subtree reached by the cards actually played is kept for the next decision
+of the round. With an executor, independent trees are grown in parallel
+and their root visit counts merged.
+"""
+import math
+import random
+import time
+from pyFiles.deck import ALL_CARDS, CARD_SUIT, CARDS
+from pyFiles.trick import TRICK_STRENGTH, NO_SUIT_SLOT, suit_slot
+from pyFiles.bitboard import SUIT_MASKS, mask_of, ids_of
+from pyFiles.player import ProbabilityPlayer
+
+DEFAULT_BUDGET_MS = 50
+EXPLORATION = 0.7
+CARD_SLOT = [int(s) if s >= 0 else NO_SUIT_SLOT for s in CARD_SUIT]
+
+
+class _Node:
+    __slots__ = ('seat', 'children', 'visits', 'reward', 'avail')
+
+    def __init__(self, seat):
+        self.seat = seat      # who played the move leading here
+        self.children = {}    # card id -> _Node
+        self.visits = 0
+        self.reward = 0.0     # summed normalized score of `seat`
+        self.avail = 1        # iterations in which this move was legal
+
+
+class _GameState:
+    # A fully determinized position: every hand as a bitmask
+    __slots__ = ('hands', 'trick', 'lead_slot', 'turn', 'tricks', 'cards_left')
+
+    def __init__(self, hands, trick, lead_slot, turn, tricks, cards_left):
+        self.hands = hands
+        self.trick = trick
+        self.lead_slot = lead_slot
+        self.turn = turn
+        self.tricks = tricks
+        self.cards_left = cards_left
+
+    def copy(self):
+        return _GameState(list(self.hands), list(self.trick), self.lead_slot, self.turn,
+                          list(self.tricks), self.cards_left)
+
+
+class SearchInfo:
+    # What the searching player knows at a decision, from its own seat
+
+    def __init__(self, seat, num_players, round_number, trump_slot, hand, unseen, counts, voids, trick,
+                 lead_slot, tricks, bids):
+        self.seat = seat
+        self.num_players = num_players
+        self.round_number = round_number
+        self.trump_slot = trump_slot
+        self.hand = hand        # own hand bitmask
+        self.unseen = unseen    # card ids held by others or not dealt
+        self.counts = counts    # cards still held per seat
+        self.voids = voids      # per seat: bitmask of cards it cannot hold
+        self.trick = trick      # (seat, card id) pairs of the current trick
+        self.lead_slot = lead_slot
+        self.tricks = tricks    # tricks won so far per seat
+        self.bids = bids
+
+
+def _legal(hand, lead_slot):
+    # Player.legal_cards on bitmasks
+    if lead_slot != NO_SUIT_SLOT:
+        follow = hand & SUIT_MASKS[lead_slot]
+        if follow:
+            return follow
+    return hand
+
+
+def _play(state, card, num_players, strength_rows):
+    seat = state.turn
+    state.hands[seat] ^= 1 << card
+    if state.lead_slot == NO_SUIT_SLOT and CARD_SLOT[card] != NO_SUIT_SLOT:
+        state.lead_slot = CARD_SLOT[card]
+    state.trick.append((seat, card))
+    if len(state.trick) < num_players:
+        state.turn = (seat + 1) % num_players
+        return
+    # Trick complete: strongest card wins, the first one on ties
+    strength = strength_rows[state.lead_slot]
+    winner, best = state.trick[0][0], strength[state.trick[0][1]]
+    for s, c in state.trick:
+        if strength[c] > best:
+            winner, best = s, strength[c]
+    state.tricks[winner] += 1
+    state.trick = []
+    state.lead_slot = NO_SUIT_SLOT
+    state.turn = winner
+    state.cards_left -= 1
+
+
+def _rewards(tricks, bids, round_number):
+    # Round.calculate_scores, scaled to [0, 1]
+    low, high = -10 * round_number, 20 + 10 * round_number
+    return [((20 + 10 * b) if t == b else -10 * abs(t - b)) - low for t, b in zip(tricks, bids)], high - low
+
+
+def determinize(info, rng):
+    # Deal the unseen cards to the other seats in the right numbers, avoiding
+    # suits a seat is known to be void in when possible
+    hands = [0] * info.num_players
+    hands[info.seat] = info.hand
+    others = sorted((s for s in range(info.num_players) if s != info.seat),
+                    key=lambda s: -info.voids[s].bit_count())
+    for _ in range(5):
+        pool = list(info.unseen)
+        rng.shuffle(pool)
+        ok = True
+        for s in others:
+            taken = 0
+            mask = 0
+            rest = []
+            for card in pool:
+                if taken < info.counts[s] and not info.voids[s] >> card & 1:
+                    mask |= 1 << card
+                    taken += 1
+                else:
+                    rest.append(card)
+            pool = rest
+            hands[s] = mask
+            ok = ok and taken == info.counts[s]
+        if ok:
+            return hands
+    # Constraints too tight to satisfy by sampling: ignore voids
+    pool = list(info.unseen)
+    rng.shuffle(pool)
+    for s in others:
+        hands[s] = mask_of(CARDS[c] for c in pool[:info.counts[s]])
+        pool = pool[info.counts[s]:]
+    return hands
+
+
+def search(info, root=None, budget_ms=DEFAULT_BUDGET_MS, max_iterations=None, rollouts_per_leaf=1,
+           exploration=EXPLORATION, rng=None):
+    # Grows `root` (a fresh tree if None) until the budget runs out; returns (root, iterations)
+    rng = rng if rng is not None else random
+    deadline = time.perf_counter() + budget_ms / 1000
+    root = root if root is not None else _Node(None)
+    n = info.num_players
+    strength_rows = TRICK_STRENGTH[info.trump_slot]
+    bids = info.bids
+    iterations = 0
+    while time.perf_counter() < deadline and (max_iterations is None or iterations < max_iterations):
+        state = _GameState(determinize(info, rng), list(info.trick), info.lead_slot, info.seat,
+                           list(info.tricks), info.round_number - sum(info.tricks))
+        node = root
+        path = [root]
+
+        # Selection and expansion among the moves legal in this determinization
+        while state.cards_left:
+            legal = ids_of(_legal(state.hands[state.turn], state.lead_slot))
+            children = node.children
+            untried = [c for c in legal if c not in children]
+            for c in legal:
+                if c in children:
+                    children[c].avail += 1
+            if untried:
+                card = rng.choice(untried)
+                node = children[card] = _Node(state.turn)
+                _play(state, card, n, strength_rows)
+                path.append(node)
+                break
+            card = max(legal, key=lambda c: children[c].reward / children[c].visits
+                       + exploration * math.sqrt(math.log(children[c].avail) / children[c].visits))
+            node = children[card]
+            _play(state, card, n, strength_rows)
+            path.append(node)
+
+        # Random playouts to the end of the round
+        totals = [0.0] * n
+        for _ in range(rollouts_per_leaf):
+            playout = state.copy() if rollouts_per_leaf > 1 else state
+            while playout.cards_left:
+                legal = ids_of(_legal(playout.hands[playout.turn], playout.lead_slot))
+                _play(playout, rng.choice(legal), n, strength_rows)
+            rewards, scale = _rewards(playout.tricks, bids, info.round_number)
+            for s in range(n):
+                totals[s] += rewards[s] / scale
+        for node in path[1:]:
+            node.visits += 1
+            node.reward += totals[node.seat] / rollouts_per_leaf
+        root.visits += 1
+        iterations += 1
+    return root, iterations
+
+
+def root_statistics(info, budget_ms, seed=None, rollouts_per_leaf=1):
+    # One independent tree, for root-parallel search in a worker process
+    root, iterations = search(info, budget_ms=budget_ms, rollouts_per_leaf=rollouts_per_leaf,
+                              rng=random.Random(seed))
+    return {card: child.visits for card, child in root.children.items()}, iterations
+
+
+class ISMCTSPlayer(ProbabilityPlayer):
+    """ProbabilityPlayer bidding, ISMCTS card play within budget_ms per decision.
+
+    rollouts_per_leaf > 1 averages several playouts per expanded node. With
+    an executor, `workers` trees are grown in parallel for each decision.
+    """
+
+    def __init__(self, name, budget_ms=DEFAULT_BUDGET_MS, rollouts_per_leaf=1, executor=None, workers=1,
+                 seed=None, **bidding):
+        super().__init__(name, **bidding)
+        self.budget_ms = budget_ms
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.search_executor = executor
+        self.search_workers = workers
+        self.rng = random.Random(seed)
+        self.seat = None
+        self.round_number = None
+        self.last_iterations = 0
+        self._root = None
+        self._root_played = 0  # len(played_cards) when the tree root was the position to move
+
+    def receive_cards(self, cards):
+        super().receive_cards(cards)
+        self._root = None
+        self.seat = None
+
+    def make_bid(self, trump_suit, round_number, position, total_players, bids_so_far=None):
+        self.seat = position
+        self.round_number = round_number
+        return super().make_bid(trump_suit, round_number, position, total_players, bids_so_far)
+
+    def _information(self, trick_so_far, trump_suit, played_cards):
+        # Replays the round from played_cards (seat 0 leads the first trick) to
+        # recover who played what, the tricks won and the voids shown so far
+        n = self.num_players or max(4, len(trick_so_far) + 1)  # four seats outside a Round, as ProbabilityPlayer
+        seat = self.seat if self.seat is not None else len(trick_so_far)
+        round_number = self.round_number or len(self.hand) + len(played_cards) // n
+        trump_slot = suit_slot(trump_suit)
+        strength_rows = TRICK_STRENGTH[trump_slot]
+
+        voids = [0] * n
+        tricks = [0] * n
+        leader = 0
+        completed = len(played_cards) - len(trick_so_far)
+        for start in range(0, completed, n):
+            lead_slot = NO_SUIT_SLOT
+            trick = []
+            for i, card in enumerate(played_cards[start:start + n]):
+                s = (leader + i) % n
+                lead_slot = self._note_play(voids, s, card.id, lead_slot)
+                trick.append((s, card.id))
+            strength = strength_rows[lead_slot]
+            winner, best = trick[0][0], strength[trick[0][1]]
+            for s, c in trick:
+                if strength[c] > best:
+                    winner, best = s, strength[c]
+            tricks[winner] += 1
+            leader = winner
+        tricks[seat] = self.tricks_won
+
+        lead_slot = NO_SUIT_SLOT
+        trick = []
+        for s, card in trick_so_far:
+            lead_slot = self._note_play(voids, s, card.id, lead_slot)
+            trick.append((s, card.id))
+
+        hand = self.hand_bits().mask
+        if self.unseen is not None:
+            unseen = self.unseen.unseen_by(hand)
+        else:
+            unseen = ALL_CARDS & ~hand & ~mask_of(played_cards)
+        played_in_trick = {s for s, _ in trick_so_far}
+        left = round_number - completed // n
+        counts = [left - (s in played_in_trick) for s in range(n)]
+        counts[seat] = len(self.hand)
+        voids[seat] = 0
+
+        # Later bids are public once made; guess an even split for any still missing
+        known = list(self.table_bids) if self.table_bids else []
+        bids = known + [round(round_number / n)] * (n - len(known))
+        bids[seat] = self.bid
+        return SearchInfo(seat, n, round_number, trump_slot, hand, ids_of(unseen), counts, voids, trick,
+                          lead_slot, tricks, bids)
+
+    @staticmethod
+    def _note_play(voids, seat, card, lead_slot):
+        # A seat that does not follow the lead suit with a regular card has none left
+        if lead_slot == NO_SUIT_SLOT:
+            return CARD_SLOT[card]
+        if CARD_SLOT[card] != lead_slot:
+            voids[seat] |= SUIT_MASKS[lead_slot]
+        return lead_slot
+
+    def _reuse_tree(self, played_cards):
+        # Follow the cards played since the last decision down the kept tree
+        root = self._root
+        if root is None or len(played_cards) < self._root_played:
+            return None
+        for card in played_cards[self._root_played:]:
+            root = root.children.get(card.id)
+            if root is None:
+                return None
+        return root
+
+    def play_card(self, trick_so_far, lead_suit, trump_suit, played_cards):
+        played_cards = played_cards if played_cards is not None else []
+        if len(self.hand_bits()) != len(self.hand):
+            # Copies of one card in the hand cannot be told apart on bitmasks
+            return super().play_card(trick_so_far, lead_suit, trump_suit, played_cards)
+        legal = self.legal_cards(lead_suit)
+        if len(legal) == 1:
+            card = legal[0]
+        else:
+            info = self._information(trick_so_far, trump_suit, played_cards)
+            if self.search_executor is not None and self.search_workers > 1:
+                seeds = [self.rng.getrandbits(63) for _ in range(self.search_workers)]
+                futures = [self.search_executor.submit(root_statistics, info, self.budget_ms, s,
+                                                       self.rollouts_per_leaf) for s in seeds]
+                visits = {}
+                self.last_iterations = 0
+                for f in futures:
+                    counts, iterations = f.result()
+                    self.last_iterations += iterations
+                    for c, v in counts.items():
+                        visits[c] = visits.get(c, 0) + v
+                self._root = None
+            else:
+                root, self.last_iterations = search(info, self._reuse_tree(played_cards), self.budget_ms,
+                                                    rollouts_per_leaf=self.rollouts_per_leaf, rng=self.rng)
+                visits = {c: child.visits for c, child in root.children.items()}
+                self._root = root
+            card = max(legal, key=lambda c: visits.get(c.id, 0))
+
+        if self._root is not None:
+            self._root = self._root.children.get(card.id)
+            self._root_played = len(played_cards) + 1
+        self.discard(card)
+        return card
@@ -1,12 +1,9 @@
 import random
-from pyFiles.simulation import simulate_trick_outcome, prob_win
-import pandas as pd
-import random
-from pyFiles.round import Round
+from pyFiles.probability import exact_prob_win, exact_trick_win
+from pyFiles.bitboard import BitHand, ids_of
+from functools import partial
 from pyFiles.genome import Genome
-
-
-RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A', 'W', 'E']
+from pyFiles.deck import RANK_INDEX, CARDS
 
 
 # Other Players
@@ -16,10 +13,19 @@ class Player:
         self.hand = []
         self.bid = 0
         self.tricks_won = 0
+        self.unseen = None       # the round's UnseenCards, read-only
+        self.num_players = None  # table size of the current round
+        self.table_bids = None   # the round's bids in seat order, read-only
 
     def receive_cards(self, cards):
         self.hand = cards
 
+    def observe(self, unseen, num_players, bids=None):
+        # Called by the Round once the cards are dealt; bids fills up during bidding
+        self.unseen = unseen
+        self.num_players = num_players
+        self.table_bids = bids
+
     def make_bid(self, trump_suit, round_number, position, total_players, bids_so_far=None):
         self.bid = random.randint(0, round_number // 2)
         return self.bid
@@ -42,10 +48,73 @@ class Player:
 
     
 
+class _PlayPlan:
+    # An EvolvedPlayer's hand ranked by card value for one round, overall and
+    # per suit, ascending (defend) and descending (attack). Stable sorts keep
+    # hand order among equal values, so the first card of each list is the
+    # one min()/max() over the legal cards would pick.
+    __slots__ = ('trump_suit', 'hand', 'any_suit', 'by_suit')
+
+    def __init__(self, hand, values, trump_suit):
+        self.trump_suit = trump_suit
+        self.hand = hand
+        positions = range(len(hand))
+        ascending = [hand[i] for i in sorted(positions, key=values.__getitem__)]
+        descending = [hand[i] for i in sorted(positions, key=lambda i: -values[i])]
+        self.any_suit = (ascending, descending)
+        self.by_suit = {}
+        for card in hand:
+            if card.rank not in ('W', 'E') and card.suit not in self.by_suit:
+                self.by_suit[card.suit] = (
+                    [c for c in ascending if c.suit == card.suit and c.rank not in ('W', 'E')],
+                    [c for c in descending if c.suit == card.suit and c.rank not in ('W', 'E')],
+                )
+
+    def choose(self, lead_suit, defend):
+        # Same choice as min/max over Player.legal_cards(lead_suit)
+        ascending, descending = self.by_suit.get(lead_suit) or self.any_suit
+        return ascending[0] if defend else descending[0]
+
+    def remove(self, card):
+        for ranked in self.any_suit:
+            ranked.remove(card)
+        suit_lists = self.by_suit.get(card.suit)
+        if suit_lists is not None and card.rank not in ('W', 'E'):
+            for ranked in suit_lists:
+                ranked.remove(card)
+            if not suit_lists[0]:
+                del self.by_suit[card.suit]
+
+
 class EvolvedPlayer(Player):
     def __init__(self, name, genome):
         super().__init__(name)
         self.genome = genome
+        self._plan = None
+        self._values = {}  # (genome key, trump suit) -> evaluate_card for every card id
+
+    def receive_cards(self, cards):
+        super().receive_cards(cards)
+        self._plan = None
+
+    def card_values(self, trump_suit):
+        # evaluate_card for every card id, computed once per genome and trump suit
+        key = (self.genome.key(), trump_suit)
+        values = self._values.get(key)
+        if values is None:
+            if len(self._values) > 8:
+                self._values.clear()  # the genome changed; drop its old tables
+            values = self._values[key] = [self.evaluate_card(c, trump_suit) for c in CARDS]
+        return values
+
+    def hand_values(self, trump_suit):
+        values = self.card_values(trump_suit)
+        return [values[c.id] if c.id is not None else self.evaluate_card(c, trump_suit) for c in self.hand]
+
+    def compile_plan(self, trump_suit):
+        # Card values stay fixed for the round once trump is known, so rank the hand once
+        self._plan = _PlayPlan(self.hand, self.hand_values(trump_suit), trump_suit)
+        return self._plan
 
     def evaluate_card(self, card, trump_suit):
         g = self.genome.genes
@@ -56,7 +125,7 @@ class EvolvedPlayer(Player):
             return g["jester_weight"]
 
         # Normal card
-        base_strength = (RANKS.index(card.rank) + 2) / 14  # Normalize to [0,1]
+        base_strength = (RANK_INDEX[card.rank] + 2) / 14  # Normalize to [0,1]
         if trump_suit and card.suit == trump_suit:
             return base_strength * g["trump_weight"]
         else:
@@ -66,7 +135,7 @@ class EvolvedPlayer(Player):
         g = self.genome.genes
 
         # 1. Evaluate hand strength
-        score = sum(self.evaluate_card(c, trump_suit) for c in self.hand)
+        score = sum(self.hand_values(trump_suit))
 
         # 2. Position bias (later position = higher value)
         if "position_bias" in g:
@@ -85,39 +154,101 @@ class EvolvedPlayer(Player):
 
         # 5. Finalize bid
         self.bid = max(0, min(round_number, round(score)))
+        self.compile_plan(trump_suit)
         return self.bid
     
     def update_memory(self, played_cards):
         self.played_cards = played_cards
 
     def play_card(self, trick_so_far, lead_suit, trump_suit, played_cards):
-        legal = self.legal_cards(lead_suit)
-
-
-        if not legal:
+        if not self.hand:
             raise ValueError(f"No legal cards for player {self.name}. Hand: {self.hand}, Lead suit: {lead_suit}")
 
+        # The plan is built when bidding; rebuild it if the hand or trump changed since
+        plan = self._plan
+        if plan is None or plan.hand is not self.hand or plan.trump_suit != trump_suit:
+            plan = self.compile_plan(trump_suit)
 
         # Play defensively if you've hit your bid
-        if self.tricks_won >= self.bid:
-            card = min(legal, key=lambda c: self.evaluate_card(c, trump_suit))
-        else:
-            card = max(legal, key=lambda c: self.evaluate_card(c, trump_suit))
+        card = plan.choose(lead_suit, self.tricks_won >= self.bid)
 
+        plan.remove(card)
         self.hand.remove(card)
         return card
     
 
 
 class ProbabilityPlayer(Player):
-    def __init__(self, name):
+    # With a rollout and/or time budget, bids come from full-round Monte Carlo
+    # rollouts (see pyFiles/rollout.py) instead of the summed win probabilities
+
+    def __init__(self, name, rollouts=None, time_budget=None, opponents=None, executor=None, workers=1):
         super().__init__(name)
+        self.bits = BitHand()  # bitboard copy of the hand
+        self.by_id = {}        # the hand's own Card objects by id
+        self._indexed = (self.hand, 0)
+        self.rollouts = rollouts
+        self.time_budget = time_budget
+        self.opponents = opponents  # player classes for the other seats in rollouts
+        self.executor = executor
+        self.workers = workers
+        self.last_estimate = None
+
+    def receive_cards(self, cards):
+        super().receive_cards(cards)
+        self._index_hand()
+
+    def _index_hand(self):
+        # Copies of one card (e.g. two Card(None, 'W')) share a bit and are listed together in by_id
+        self.bits = BitHand(self.hand)
+        self.by_id = {}
+        for card in self.hand:
+            self.by_id.setdefault(card.id, []).append(card)
+        self._indexed = (self.hand, len(self.hand))
+
+    def hand_bits(self):
+        # Re-indexed if the hand list was replaced or changed without receive_cards
+        if self._indexed[0] is not self.hand or self._indexed[1] != len(self.hand):
+            self._index_hand()
+        return self.bits
+
+    def hand_cards(self, mask):
+        # The hand's own Card objects for the ids set in mask
+        self.hand_bits()
+        return [card for i in ids_of(mask) for card in self.by_id[i]]
+
+    def discard(self, card):
+        # Removes a card of the hand from the hand, the bitboard and by_id
+        self.hand_bits()
+        self.hand.remove(card)
+        copies = self.by_id[card.id]
+        copies.remove(card)
+        if not copies:
+            del self.by_id[card.id]
+            self.bits.remove(card)
+        self._indexed = (self.hand, len(self.hand))
+
+    def unseen_mask(self):
+        # Cards this player has not seen (played cards, the trump card and its own
+        # hand excluded), or None outside a Round
+        if self.unseen is None:
+            return None
+        return self.unseen.unseen_by(self.hand_bits().mask)
 
     def make_bid(self, trump_suit, round_number, position, total_players, bids_so_far=None):
-        # Bids based purely on the summed probability of each card winning a trick.
-        
+        if self.rollouts is not None or self.time_budget is not None:
+            from pyFiles.rollout import rollout_bid  # rollout.py imports this module
+            self.last_estimate = rollout_bid(
+                self.hand, trump_suit, round_number, position, total_players, bids_so_far or (),
+                self.unseen.mask if self.unseen is not None else None, self.opponents,
+                self.rollouts, self.time_budget, executor=self.executor, workers=self.workers)
+            self.bid = self.last_estimate.bid
+            return self.bid
+
+        # Bids the expected number of tricks: the summed exact probability of each card winning a trick.
+        unseen = self.unseen_mask()
         probs = [
-            prob_win(card, self.hand, trump_suit, total_players, round_number)
+            exact_prob_win(card, self.hand, trump_suit, total_players, round_number, unseen)
             for card in self.hand
         ]
 
@@ -126,23 +257,22 @@ class ProbabilityPlayer(Player):
         return self.bid
     
     def play_card(self, trick_so_far, lead_suit, trump_suit, played_cards):
-        legal = self.legal_cards(lead_suit)
-
-        # Use prob_win instead of evaluate_card
+        legal = self.hand_cards(self.hand_bits().legal(lead_suit))
+
+        # Use exact win probabilities instead of evaluate_card: a card already
+        # beaten by the trick cannot win, otherwise it has to survive the
+        # players still to act (four seats when playing outside a Round)
+        num_players = self.num_players or 4
+        unseen = self.unseen_mask()
+        key = lambda c: exact_trick_win(c, trick_so_far, lead_suit, self.hand, trump_suit, num_players, unseen)
         if self.tricks_won >= self.bid:
             # Defend (lose)
-            card = min(
-                legal,
-                key=lambda c: prob_win(c, self.hand, trump_suit, 4, len(self.hand))
-            )
+            card = min(legal, key=key)
         else:
             # Attack (win)
-            card = max(
-                legal,
-                key=lambda c: prob_win(c, self.hand, trump_suit, 4, len(self.hand))
-            )
+            card = max(legal, key=key)
 
-        self.hand.remove(card)
+        self.discard(card)
         return card
     
 
@@ -179,94 +309,24 @@ class HumanPlayer(Player):
         return card
 
 
-def validate_probability_player(games=100, num_players=5):
-    prob_bot = ProbabilityPlayer("ProbabilityBot")
-    baseline_names = [f"Bot{i}" for i in range(num_players - 1)]
-    baseline_bots = [Player(name) for name in baseline_names]
-
-    score_total = 0
-    hit_bid_count = 0
-    bid_distribution = []
-
-    for _ in range(games):
-        players = [prob_bot] + random.sample(baseline_bots, k=num_players - 1)
-        round_number = random.randint(1, 60 // num_players)
-        game = Round([p.name for p in players], round_number)
-        game.players = players
-        game.play_round()
-
-        for p in players:
-            if p.name == "ProbabilityBot":
-                bid_distribution.append(p.bid)
-                score = 20 + 10 * p.tricks_won if p.tricks_won == p.bid else -abs(p.tricks_won - p.bid)
-                score_total += score
-                if p.tricks_won == p.bid:
-                    hit_bid_count += 1
-                p.tricks_won = 0
-                p.bid = 0
-            else:
-                p.tricks_won = 0
-                p.bid = 0
-
-    avg_score = score_total / games
-    hit_rate = hit_bid_count / games
-
-    bid_counts = pd.Series(bid_distribution).value_counts().sort_index()
-    bid_percentages = (bid_counts / len(bid_distribution) * 100).round(2)
-
-    bid_freq = pd.DataFrame({
-        "Count": bid_counts,
-        "Percent": bid_percentages.astype(str) + "%"
-    })
-
-    df = pd.DataFrame({
-        "Metric": ["Avg Score", "Hit Bid %", "Games"],
-        "Value": [f"{avg_score:.2f}", f"{hit_rate:.2%}", f"{games}"]
-    })
-
-    return df, bid_freq
-
-def compare_players(evolved_genome, games=1000, num_players=5):
-    evo_bot = EvolvedPlayer("Evolved", Genome(genes=evolved_genome))
-    prob_bot = ProbabilityPlayer("Prob")
-    
-    bots = [evo_bot, prob_bot]
-    results = {bot.name: {"score": 0, "hit_bid": 0, "bids": []} for bot in bots}
-    
-    #baseline_names = [f"Bot{i}" for i in range(num_players - 2)]
-    #baseline_bots = [Player(name) for name in baseline_names]
-
-    baseline_bots = [Player(f"Baseline{i}") for i in range(20)]
-
-    for _ in range(games):
-        for bot in bots:
-            players = [bot] + random.sample(baseline_bots, k=num_players - 1)
-            round_number = random.randint(1, 60 // num_players)
-            game = Round([p.name for p in players], round_number)
-            game.players = players
-            game.play_round()
-
-            for p in players:
-                if p.name == bot.name:
-                    score = 20 * p.bid if p.tricks_won == p.bid else -abs(10 * (p.tricks_won - p.bid))
-                    results[p.name]["score"] += score
-                    results[p.name]["hit_bid"] += int(p.tricks_won == p.bid)
-                    results[p.name]["bids"].append(p.bid)
-                p.tricks_won = 0
-                p.bid = 0
-
-    df_summary = pd.DataFrame([
-        {
-            "Bot": name,
-            "Avg Score": res["score"] / games,
-            "Hit Bid %": res["hit_bid"] / games * 100,
-        }
-        for name, res in results.items()
-    ])
-
-    df_bids = pd.DataFrame({
-        name: pd.Series(res["bids"])
-        for name, res in results.items()
-    })
-
-    return df_summary, df_bids
\ No newline at end of file
+def validate_probability_player(games=100, num_players=5, workers=1, seed=None):
+    # tournament.py imports this module
+    from pyFiles.tournament import GameSpec, run_tournament, validation_summary, bid_frequencies
+
+    spec = GameSpec(games, num_players, seed=seed)
+    results = run_tournament({"ProbabilityBot": ProbabilityPlayer}, spec, workers)
+    return validation_summary(results, "ProbabilityBot"), bid_frequencies(results, "ProbabilityBot")
+
+def compare_players(evolved_genome, games=1000, num_players=5, deals=None, workers=1, seed=None):
+    # With deals (see pyFiles/deals.py) the bots play exactly those rounds; either way
+    # both bots play the same rounds
+    # tournament.py imports this module
+    from pyFiles.tournament import GameSpec, run_tournament, summarize, bid_table
+
+    entrants = {
+        "Evolved": partial(EvolvedPlayer, genome=Genome(genes=evolved_genome)),
+        "Prob": ProbabilityPlayer,
+    }
+    spec = GameSpec(games, None if deals is not None else num_players, seed=seed, deals=deals)
+    results = run_tournament(entrants, spec, workers)
+    return summarize(results), bid_table(results)
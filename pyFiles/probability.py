@@ -0,0 +1,126 @@
+"""Exact trick-win probabilities by hypergeometric counting.
+
+A card leading a trick wins unless one of the opponents holds a card that
+beats it. With U unseen cards, B of which beat the lead, and k opponents
+each holding a distinct unseen card, no opponent beats it with probability
+
+    C(U - B, k) / C(U, k)
+
+which is what estimate_trick_win approximates by sampling. The values for
+every (U, B, k) are kept in a small table that is generated on first use,
+saved next to this module and loaded from disk afterwards.
+"""
+import math
+import os
+import uuid
+from pathlib import Path
+import numpy as np
+from pyFiles.deck import NUM_CARDS, ALL_CARDS
+from pyFiles.deals import MAX_PLAYERS
+from pyFiles.trick import NO_SUIT_SLOT, suit_slot, resolve_trick
+from pyFiles.simulation import BEATS, win_cache, hand_context, _card_key
+
+MAX_OPPONENTS = MAX_PLAYERS - 1  # larger tables fall back to math.comb in win_probability
+TABLE_PATH = Path(__file__).resolve().parent / "data" / "win_table.npy"
+
+# BEATER_MASKS[trump_slot][card_id]: bitmask of the cards that beat card_id when it leads
+BEATER_MASKS = [
+    [sum(1 << other for other in np.flatnonzero(BEATS[trump, card])) for card in range(NUM_CARDS)]
+    for trump in range(NO_SUIT_SLOT + 1)
+]
+
+_table = None
+
+
+def build_win_table():
+    # table[unseen, beaters, opponents] = C(unseen - beaters, opponents) / C(unseen, opponents)
+    table = np.zeros((NUM_CARDS + 1, NUM_CARDS + 1, MAX_OPPONENTS + 1))
+    for unseen in range(NUM_CARDS + 1):
+        for opponents in range(min(unseen, MAX_OPPONENTS) + 1):
+            total = math.comb(unseen, opponents)
+            for beaters in range(unseen + 1):
+                table[unseen, beaters, opponents] = math.comb(unseen - beaters, opponents) / total
+    return table
+
+
+def load_win_table(path=TABLE_PATH):
+    # Generated once and saved; later processes just load the file
+    global _table
+    if _table is not None and path == TABLE_PATH:
+        return _table
+    path = Path(path)
+    try:
+        table = np.load(path)
+        if table.shape != (NUM_CARDS + 1, NUM_CARDS + 1, MAX_OPPONENTS + 1):
+            raise ValueError(f"{path} was built for a different table size")
+    except (OSError, ValueError):
+        table = build_win_table()
+        tmp = path.with_name(f".{path.name}-{uuid.uuid4().hex}.npy")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(tmp, table)
+            os.replace(tmp, path)  # concurrent builders all write the same table
+        except OSError:
+            # Read-only install: keep using the table built in memory
+            tmp.unlink(missing_ok=True)
+    if path == TABLE_PATH:
+        _table = table
+    return table
+
+
+def win_probability(unseen, beaters, opponents):
+    # Chance that none of `opponents` distinct cards drawn from `unseen` is one of `beaters`
+    opponents = max(0, min(opponents, unseen))  # no opponents left to act: the card survives
+    if opponents <= MAX_OPPONENTS:
+        return float(load_win_table()[unseen, beaters, opponents])
+    return math.comb(unseen - beaters, opponents) / math.comb(unseen, opponents)
+
+
+def hand_mask(cards):
+    mask = 0
+    for c in cards:
+        if c.id is None:
+            raise ValueError("Exact probabilities need cards from the standard deck")
+        mask |= 1 << c.id
+    return mask
+
+
+def exact_prob_win(card, hand, trump_suit, num_players, round_length=None, unseen=None):
+    """Exact probability that `card` wins the trick it leads.
+
+    Every card outside `hand` (and `card`) counts as unseen, unless an
+    `unseen` bitmask of card ids is given. round_length is accepted for
+    drop-in use in place of prob_win; the answer does not depend on it.
+    """
+    if card.rank == 'W':  # Wizard always wins
+        return 1.0
+    if card.rank == 'E':  # Jester always loses
+        return 0.0
+    if card.id is None:
+        raise ValueError("Exact probabilities need cards from the standard deck")
+
+    if unseen is None:
+        unseen = ALL_CARDS & ~hand_mask(hand)
+    unseen &= ~(1 << card.id)
+    beaters = BEATER_MASKS[suit_slot(trump_suit)][card.id] & unseen
+    return win_probability(unseen.bit_count(), beaters.bit_count(), num_players - 1)
+
+
+def exact_trick_win(card, trick, lead_suit, hand, trump_suit, num_players, unseen=None):
+    """Exact probability that `card`, played into the partial `trick`, wins it.
+
+    trick holds the (seat, card) pairs played so far; the remaining
+    num_players - len(trick) - 1 players each still add one unseen card.
+    """
+    if trick:
+        if lead_suit is None and card.rank not in ('W', 'E'):
+            lead_suit = card.suit
+        if resolve_trick(trick + [(None, card)], lead_suit, trump_suit) is not None:
+            return 0.0  # already beaten
+    return exact_prob_win(card, hand, trump_suit, num_players - len(trick), unseen=unseen)
+
+
+def cached_exact_prob_win(card, hand, trump_suit, num_players, round_length=None, cache=win_cache):
+    # exact_prob_win through the shared win-probability cache, for callers without an unseen mask
+    key = ("exact", _card_key(card), trump_suit, num_players, round_length, hand_context(hand))
+    return cache.get_or_compute(key, lambda: exact_prob_win(card, hand, trump_suit, num_players, round_length))
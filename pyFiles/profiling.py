@@ -0,0 +1,84 @@
+import time
+from contextlib import contextmanager
+from functools import wraps
+import pandas as pd
+
+ROUND_PHASES = ("setup_round", "collect_bids", "play_tricks", "resolve_trick")
+DECISIONS = ("make_bid", "play_card")
+
+
+class RoundProfiler:
+    # Cumulative time and call counts for Round phases and per-player-class
+    # decision latency. Rounds only pay for it when one is passed in.
+
+    def __init__(self):
+        self.phases = {}     # phase -> [calls, seconds]
+        self.decisions = {}  # (player class, method) -> [calls, seconds]
+
+    def _add(self, table, key, seconds, calls=1):
+        entry = table.setdefault(key, [0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+
+    def attach(self, game):
+        # Shadow the round's phase methods on this instance only
+        for phase in ROUND_PHASES:
+            method = getattr(game, phase)
+            if phase in ("collect_bids", "play_tricks"):
+                method = self._with_players(game, method)
+            setattr(game, phase, self._timed(self.phases, phase, method))
+
+    def _timed(self, table, key, fn):
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._add(table, key, time.perf_counter() - start)
+        return timed
+
+    def _with_players(self, game, fn):
+        @wraps(fn)
+        def instrumented(*args, **kwargs):
+            # game.players is often swapped after construction, so read it per call
+            with self.decision_timing(game.players):
+                return fn(*args, **kwargs)
+        return instrumented
+
+    @contextmanager
+    def decision_timing(self, players):
+        patched = []
+        for player in players:
+            for method in DECISIONS:
+                if method in vars(player):
+                    continue
+                key = (type(player).__name__, method)
+                setattr(player, method, self._timed(self.decisions, key, getattr(player, method)))
+                patched.append((player, method))
+        try:
+            yield
+        finally:
+            for player, method in patched:
+                delattr(player, method)
+
+    def merge(self, other):
+        for key, (calls, seconds) in other.phases.items():
+            self._add(self.phases, key, seconds, calls)
+        for key, (calls, seconds) in other.decisions.items():
+            self._add(self.decisions, key, seconds, calls)
+        return self
+
+    def reset(self):
+        self.phases.clear()
+        self.decisions.clear()
+
+    def summary(self):
+        rows = []
+        for phase, (calls, seconds) in self.phases.items():
+            rows.append({"Kind": "phase", "Name": phase, "Calls": calls, "Total (s)": seconds,
+                         "Mean (ms)": seconds / calls * 1000 if calls else 0.0})
+        for (cls, method), (calls, seconds) in self.decisions.items():
+            rows.append({"Kind": "decision", "Name": f"{cls}.{method}", "Calls": calls, "Total (s)": seconds,
+                         "Mean (ms)": seconds / calls * 1000 if calls else 0.0})
+        return pd.DataFrame(rows, columns=["Kind", "Name", "Calls", "Total (s)", "Mean (ms)"])
@@ -0,0 +1,161 @@
+"""Monte Carlo bidding from complete rollouts of the round.
+
+The bidder's information set is its own hand, the trump card, its seat and
+the bids already made. Each rollout deals the unseen cards to the other
+seats at random, fixes the bidder's bid to one of the candidate bids and
+plays the whole round with Round.play_round; opponents bid and play with
+their own policies, earlier bidders keep the bids they actually made.
+Averaging the scores per candidate gives the bid with the best expected
+score, under a rollout count and/or wall-clock budget.
+"""
+import time
+import numpy as np
+from pyFiles.deck import NUM_CARDS, ALL_CARDS, CARD_SUIT, SUIT_INDEX
+from pyFiles.bitboard import mask_of, ids_of
+from pyFiles.deals import Deal
+from pyFiles.round import Round
+from pyFiles.probability import exact_prob_win
+from pyFiles.player import Player, ProbabilityPlayer
+
+CANDIDATE_WINDOW = 2  # default candidates: the analytic bid +/- this many tricks
+
+
+class BidEstimate:
+    # Result of rollout_bid: the chosen bid, mean score and trick-count
+    # distribution per candidate bid, and what the budget paid for
+
+    def __init__(self, candidates, score_sums, counts, trick_counts, elapsed):
+        self.candidates = list(candidates)
+        self.rollouts = int(counts.sum())
+        self.elapsed = elapsed
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = score_sums / counts
+            distributions = trick_counts / counts[:, None]
+        self.expected_scores = {b: float(m) for b, m, n in zip(self.candidates, means, counts) if n}
+        self.trick_distributions = {b: d for b, d, n in zip(self.candidates, distributions, counts) if n}
+        # Ties go to the lower bid
+        self.bid = max(self.expected_scores, key=lambda b: (self.expected_scores[b], -b)) \
+            if self.expected_scores else self.candidates[0]
+
+    @property
+    def trick_distribution(self):
+        # Distribution of the bidder's tricks when it bids self.bid
+        return self.trick_distributions.get(self.bid)
+
+    def __repr__(self):
+        return f"BidEstimate(bid={self.bid}, rollouts={self.rollouts}, elapsed={self.elapsed:.3f}s)"
+
+
+def _fix_bid(player, bid):
+    # Shadow make_bid on this instance so the player always bids `bid`
+    def make_bid(trump_suit, round_number, position, total_players, bids_so_far=None):
+        player.bid = bid
+        return bid
+    player.make_bid = make_bid
+
+
+def run_rollouts(hand_ids, trump_id, trump_suit, round_number, position, num_players, bids_so_far,
+                 unseen_ids, opponents, candidates, max_rollouts, deadline, seed=None):
+    # One worker's share of the rollouts; returns per-candidate score sums,
+    # rollout counts and (candidate, tricks) counts
+    rng = np.random.default_rng(seed)
+    me = ProbabilityPlayer("Bidder")
+    others = [factory(f"Opponent{i}") for i, factory in enumerate(opponents)]
+    for player, bid in zip(others[:position], bids_so_far):
+        _fix_bid(player, bid)
+    players = others[:position] + [me] + others[position:]
+    game = Round(players, round_number)
+
+    # Without a known trump card, one of the unseen cards of the trump suit is turned each rollout
+    # and the opponents are dealt from the rest, other cards of the trump suit included
+    unseen_ids = np.asarray(unseen_ids)
+    if trump_id is None and trump_suit is not None:
+        trump_pool = unseen_ids[CARD_SUIT[unseen_ids] == SUIT_INDEX[trump_suit]]
+    else:
+        trump_pool = None
+    dealt = (num_players - 1) * round_number
+
+    score_sums = np.zeros(len(candidates))
+    counts = np.zeros(len(candidates), dtype=np.int64)
+    trick_counts = np.zeros((len(candidates), round_number + 1), dtype=np.int64)
+    done = 0
+    while (max_rollouts is None or done < max_rollouts) and (deadline is None or time.time() < deadline):
+        k = done % len(candidates)
+        bid = candidates[k]
+        _fix_bid(me, bid)
+
+        if trump_pool is not None:
+            trump = int(rng.choice(trump_pool)) if len(trump_pool) else -1
+            pool = unseen_ids[unseen_ids != trump]
+        else:
+            trump = trump_id if trump_id is not None else -1
+            pool = unseen_ids
+        drawn = rng.choice(pool, dealt, replace=False).tolist()
+        hands = [drawn[i * round_number:(i + 1) * round_number] for i in range(num_players - 1)]
+        hands.insert(position, list(hand_ids))
+        for p in players:
+            p.reset()
+        game.play_round(Deal(num_players, round_number, position, hands, trump, 0))
+
+        tricks = me.tricks_won
+        score_sums[k] += 20 + 10 * bid if tricks == bid else -10 * abs(tricks - bid)
+        counts[k] += 1
+        trick_counts[k, tricks] += 1
+        done += 1
+    return score_sums, counts, trick_counts
+
+
+def rollout_bid(hand, trump_suit, round_number, position, num_players, bids_so_far=(), unseen=None,
+                opponents=None, rollouts=None, time_budget=None, candidates=None, executor=None, workers=1,
+                seed=None):
+    """Bid that maximizes the expected score over full-round rollouts.
+
+    unseen is the round's UnseenCards mask (see Player.observe); without it
+    the trump card is unknown and drawn from the trump suit. opponents are
+    num_players - 1 callables taking a name (player classes work, and must be
+    picklable for a process pool), defaulting to Player. Stops after
+    `rollouts` rollouts or `time_budget` seconds, whichever comes first.
+    With an executor the work is split into `workers` independent shares.
+    """
+    if rollouts is None and time_budget is None:
+        raise ValueError("rollout_bid needs a rollout or time budget")
+    opponents = list(opponents) if opponents is not None else [Player] * (num_players - 1)
+    if len(opponents) != num_players - 1:
+        raise ValueError(f"Expected {num_players - 1} opponents, got {len(opponents)}")
+    if num_players * round_number > NUM_CARDS:
+        raise ValueError(f"Not enough cards to deal {round_number} to {num_players} players")
+
+    hand_bits = mask_of(hand)
+    if unseen is not None:
+        unseen &= ~hand_bits
+        unseen_ids = ids_of(unseen)
+        # Before any card is played, the only card outside the hand and the unseen set is the trump card
+        turned = ids_of(ALL_CARDS & ~unseen & ~hand_bits)
+        trump_id = turned[0] if turned else -1
+    else:
+        unseen_ids = ids_of(ALL_CARDS & ~hand_bits)
+        trump_id = None if trump_suit is not None else -1
+
+    if candidates is None:
+        expected = sum(exact_prob_win(c, hand, trump_suit, num_players, round_number, unseen) for c in hand)
+        center = round(expected)
+        candidates = range(max(0, center - CANDIDATE_WINDOW), min(round_number, center + CANDIDATE_WINDOW) + 1)
+    candidates = list(candidates)
+
+    start = time.time()
+    deadline = start + time_budget if time_budget is not None else None
+    args = ([c.id for c in hand], trump_id, trump_suit, round_number, position, num_players,
+            list(bids_so_far)[:position], unseen_ids, opponents, candidates)
+
+    if executor is None or workers <= 1:
+        results = [run_rollouts(*args, rollouts, deadline, seed)]
+    else:
+        share = -(-rollouts // workers) if rollouts is not None else None  # ceil
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        futures = [executor.submit(run_rollouts, *args, share, deadline, s) for s in seeds]
+        results = [f.result() for f in futures]
+
+    score_sums = sum(r[0] for r in results)
+    counts = sum(r[1] for r in results)
+    trick_counts = sum(r[2] for r in results)
+    return BidEstimate(candidates, score_sums, counts, trick_counts, time.time() - start)
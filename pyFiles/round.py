@@ -1,13 +1,15 @@
 
 import random
-from pyFiles.deck import Deck
+from pyFiles.deck import ArrayDeck
+from pyFiles.trick import resolve_trick
+from pyFiles.cardcount import UnseenCards
 
 
 class Round:
-    def __init__(self, players, round_number):
+    def __init__(self, players, round_number, profiler=None, recorder=None):
         self.players = players
         self.round_number = round_number
-        self.deck = Deck()
+        self.deck = ArrayDeck()
         self.trump_card = None
         self.trump_suit = None
         self.leader_index = 0  # Rotates each round
@@ -16,16 +18,27 @@ class Round:
         self.played_cards = []   # all played cards this round
         self.trick_number = 0
         self.lead_suit = None
+        self.unseen = UnseenCards()  # shared read-only with the players, see observe_round
+        self.bids = []               # bids in seat order, filled in by collect_bids; also shared
+
+        self.recorder = recorder  # optional GameRecorder that logs every played round
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.attach(self)
+
+    def setup_round(self, deal=None):
+        if deal is not None:
+            self.setup_from_deal(deal)
+            return
 
-    def setup_round(self):
         self.deck.reset()
         # Deal cards
         for player in self.players:
-            player.receive_cards(self.deck.deal(self.round_number))
+            player.receive_cards(self.deck.deal_cards(self.round_number))
 
         # Determine trump card (next card from deck or None)
         if len(self.deck) > 0:
-            self.trump_card = self.deck.deal(1)[0]
+            self.trump_card = self.deck.deal_cards(1)[0]
             if self.trump_card.rank not in ('W', 'J'):
                 self.trump_suit = self.trump_card.suit
             else:
@@ -35,10 +48,28 @@ class Round:
             self.trump_suit = None
 
         # print(f"Trump card: {self.trump_card} → Trump suit: {self.trump_suit}")
+        self.observe_round()
+
+    def setup_from_deal(self, deal):
+        # Use a pre-generated Deal (see pyFiles/deals.py) instead of shuffling
+        for seat, player in enumerate(self.players):
+            player.receive_cards(deal.hand_cards(seat))
+        self.trump_card = deal.trump_card()
+        self.trump_suit = self.trump_card.suit if self.trump_card is not None else None
+        self.observe_round()
+
+    def observe_round(self):
+        # Start counting cards for a freshly dealt round: only the trump card has been seen.
+        # Call this after dealing when setting a round up by hand instead of via setup_round.
+        self.unseen.reset(self.trump_card)
+        self.bids.clear()
+        for player in self.players:
+            player.observe(self.unseen, len(self.players), self.bids)
 
     def collect_bids(self):
         # print("\n--- Bidding Phase ---")
-        bids = []
+        bids = self.bids
+        bids.clear()
         for i, player in enumerate(self.players):
             bid = player.make_bid(
                 self.trump_suit, self.round_number, i, len(self.players), bids)
@@ -47,10 +78,14 @@ class Round:
 
     def play_tricks(self):
         # print("\n--- Playing Tricks ---")
-        played_cards = []
+        # Reuse the round's buffers instead of allocating new lists per trick
+        played_cards = self.played_cards
+        played_cards.clear()
+        trick = self.current_trick
+        unseen = self.unseen
         for trick_num in range(self.round_number):
             # print(f"\nTrick {trick_num + 1}:")
-            trick = []
+            trick.clear()
             lead_suit = None
             for i in range(len(self.players)):
                 player_index = (self.leader_index + i) % len(self.players)
@@ -62,6 +97,7 @@ class Round:
                 # print(f"{player.name} plays {card}")
                 trick.append((player_index, card))
                 played_cards.append(card)
+                unseen.see(card)
             winner_index = self.resolve_trick(trick, lead_suit)
             self.players[winner_index].tricks_won += 1
             # print(f"{self.players[winner_index].name} wins the trick")
@@ -84,6 +120,7 @@ class Round:
             self.lead_suit = card.suit
         self.current_trick.append((self.players.index(player), card))
         self.played_cards.append(card)
+        self.unseen.see(card)
 
     def is_trick_complete(self):
         # Count only players who still have cards
@@ -101,37 +138,11 @@ class Round:
         return self.trick_number >= self.round_number
 
     def resolve_trick(self, trick, lead_suit):
-        def card_strength(card):
-            if card.rank == 'W':
-                return (3, 0)  # Highest
-            elif card.rank == 'E':
-                return (0, 0)  # Lowest
-            elif self.trump_suit and card.suit == self.trump_suit:
-                return (2, Deck.ranks.index(card.rank))
-            elif card.suit == lead_suit:
-                return (1, Deck.ranks.index(card.rank))
-            else:
-                return (0, 0)
-
-        winner = max(trick, key=lambda x: card_strength(x[1]))
-        return winner[0]
+        return resolve_trick(trick, lead_suit, self.trump_suit)
 
     @staticmethod
     def resolve_trick_static(trick, lead_suit, trump_suit):
-        def card_strength(card):
-            if card.rank == 'W':
-                return (3, 0)  # Highest tier
-            elif card.rank == 'E':
-                return (0, 0)  # Lowest tier
-            elif trump_suit and card.suit == trump_suit:
-                return (2, Deck.ranks.index(card.rank))
-            elif lead_suit and card.suit == lead_suit:
-                return (1, Deck.ranks.index(card.rank))
-            else:
-                return (0, 0)
-
-        winner = max(trick, key=lambda x: card_strength(x[1]))
-        return winner[0]
+        return resolve_trick(trick, lead_suit, trump_suit)
 
     def calculate_scores(self):
         scores = {}
@@ -164,18 +175,22 @@ class Round:
         return self.trump_card, self.trump_suit
 
     def reset_round_state(self):
-        self.current_trick = []
-        self.played_cards = []
+        self.current_trick.clear()
+        self.played_cards.clear()
         self.trick_number = 0
         self.leader_index = 0
         self.lead_suit = None
 
-    def play_round(self):
-        self.setup_round()
+    def play_round(self, deal=None):
+        self.setup_round(deal)
+        if self.recorder is not None:
+            hands = [[card.id for card in p.hand] for p in self.players]
         self.collect_bids()
         self.play_tricks()
         self.show_results()
         scores = self.calculate_scores()
+        if self.recorder is not None:
+            self.recorder.record_round(self, hands, scores)
         self.reset_round_state()
         #self.reset_players()
         return scores
@@ -0,0 +1,60 @@
+import threading
+import pandas as pd
+import pyFiles.genetic as genetic
+
+
+class EvolutionRunner:
+    # Runs evolve_iter on a background thread. Callers such as the Streamlit
+    # app poll snapshot() for the generations finished so far and can stop()
+    # the run; it ends after the generation in progress.
+
+    def __init__(self, **evolve_kwargs):
+        self.evolve_kwargs = evolve_kwargs
+        self.num_generations = genetic.NUM_GENERATIONS
+        self.progress = []  # one evolve_iter stats dict per finished generation
+        self.best_genome = None
+        self.error = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            raise RuntimeError("EvolutionRunner can only be started once")
+        self._thread = threading.Thread(target=self._run, name="evolution", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for stats in genetic.evolve_iter(stop_event=self._stop_event, **self.evolve_kwargs):
+                with self._lock:
+                    self.progress.append(stats)
+                    self.best_genome = stats["best_genome"]
+        except Exception as e:
+            self.error = e
+
+    def stop(self):
+        self._stop_event.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def snapshot(self):
+        # (df_history, best_genome_data, df_genomes) for the generations so far, like evolve()
+        with self._lock:
+            progress = list(self.progress)
+            best_genome = self.best_genome
+        history = [{k: v for k, v in stats.items() if k not in ("top_genome", "best_genome")}
+                   for stats in progress]
+        genomes = [{"generation": stats["generation"], **stats["top_genome"]} for stats in progress]
+        return pd.DataFrame(history), best_genome, pd.DataFrame(genomes)
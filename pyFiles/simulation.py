@@ -1,60 +1,150 @@
+from collections import OrderedDict
+import numpy as np
+from pyFiles.deck import Deck, NUM_CARDS, CARD_SUIT, CARD_RANK, IS_WIZARD, IS_JESTER
+from pyFiles.trick import NO_SUIT_SLOT, suit_slot
 
-import random
-from pyFiles.deck import Deck, Card
+_rng = np.random.default_rng()
+
+
+def _beats_table(trump):
+    # beats[ours, other]: True if `other` beats our (leading) card.
+    # Wizards beat everything, Jesters nothing; otherwise a higher card of
+    # our suit or any trump card when we are not trump.
+    ours_suit = CARD_SUIT[:, None]
+    other_suit = CARD_SUIT[None, :]
+    higher = (other_suit == ours_suit) & (CARD_RANK[None, :] > CARD_RANK[:, None])
+    trumps = (other_suit == trump) & (ours_suit != trump)
+    beats = (higher | trumps | IS_WIZARD[None, :]) & ~IS_JESTER[None, :]
+    beats[IS_WIZARD | IS_JESTER] = False  # handled directly
+    return beats
+
+
+# BEATS[trump_slot][ours, other]
+BEATS = np.array([_beats_table(trump) for trump in range(NO_SUIT_SLOT + 1)])
+
+
+def _known_ids(card, hand):
+    ids = [c.id for c in hand] + [card.id]
+    if any(i is None for i in ids):
+        raise ValueError("Monte Carlo estimates need cards from the standard deck")
+    return ids
+
+
+class WinProbabilityCache:
+    # Bounded LRU cache for win-probability queries with hit/miss counters
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get_or_compute(self, key, compute):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+win_cache = WinProbabilityCache()
+
+
+def _card_key(card):
+    return (card.suit, card.rank)
+
+
+def cached_prob_win(card, hand, trump_suit, num_players, round_length, cache=win_cache):
+    # The heuristic ignores the rest of the hand, so it is left out of the key
+    key = ("heuristic", _card_key(card), trump_suit, num_players, round_length)
+    return cache.get_or_compute(key, lambda: prob_win(card, hand, trump_suit, num_players, round_length))
+
+
+def hand_context(hand):
+    # Estimates depend on which cards are known, not on their order
+    return tuple(sorted((_card_key(c) for c in hand), key=str))
+
+
+def cached_simulate_trick_outcome(card, hand, trump_suit, num_players, round_length, trials=100, tol=None, cache=win_cache):
+    key = ("simulated", _card_key(card), trump_suit, num_players, round_length, hand_context(hand), trials, tol)
+    return cache.get_or_compute(
+        key, lambda: estimate_trick_win(card, hand, trump_suit, num_players, trials=trials, tol=tol)[0])
+
+
+def estimate_trick_win(card, hand, trump_suit, num_players, trials=100, tol=None, batch_size=1000, rng=None):
+    """Monte Carlo estimate of `card` winning the trick it leads.
+
+    Opponent cards for all trials are sampled at once from the cards not in
+    `hand`. With `tol`, sampling stops early once the standard error drops
+    below it. Returns (estimate, standard_error).
+    """
+    if trials < 1:
+        raise ValueError(f"trials must be at least 1, got {trials}")
+    if card.rank == 'W':  # Wizard always wins
+        return 1.0, 0.0
+    if card.rank == 'E':  # Jester always loses
+        return 0.0, 0.0
+
+    rng = rng if rng is not None else _rng
+    known = np.zeros(NUM_CARDS, dtype=bool)
+    known[_known_ids(card, hand)] = True
+    remaining = np.flatnonzero(~known)
+    opponents = min(num_players - 1, len(remaining))
+    if opponents <= 0:
+        return 1.0, 0.0
+
+    beaters = BEATS[suit_slot(trump_suit)][card.id][remaining]
 
-def simulate_trick_outcome(card, hand, trump_suit, num_players, round_length):
-    # Simple simulation to estimate probability of winning
     wins = 0
-    trials = 100
-    
-    for _ in range(trials):
-        # Create a new deck without the cards we know about
-        deck = Deck()
-        deck.reset()
-        
-        # Remove known cards from deck
-        for c in hand + [card]:
-            for dc in deck.cards[:]:
-                if dc.rank == c.rank and dc.suit == c.suit:
-                    deck.cards.remove(dc)
-                    break
-        
-        # Simulate other players' cards
-        other_cards = []
-        for _ in range(num_players - 1):
-            if deck.cards:
-                other_cards.append(random.choice(deck.cards))
-        
-        # Determine if our card would win
-        if card.rank == 'W':  # Wizard always wins
-            wins += 1
-        elif card.rank == 'E':  # Jester always loses
-            wins += 0
-        else:
-            # Check if any other card beats ours
-            our_strength = (Deck.ranks.index(card.rank), card.suit == trump_suit)
-            beaten = False
-            
-            for other in other_cards:
-                if other.rank == 'W':  # Wizard beats everything
-                    beaten = True
-                    break
-                elif other.rank == 'E':  # Jester loses to everything
-                    continue
-                else:
-                    other_strength = (Deck.ranks.index(other.rank), other.suit == trump_suit)
-                    if other.suit == card.suit:  # Same suit
-                        if other_strength[0] > our_strength[0]:  # Higher rank
-                            beaten = True
-                            break
-                    elif other.suit == trump_suit:  # Trump beats non-trump
-                        beaten = True
-                        break
-            
-            if not beaten:
-                wins += 1
-    
-    return wins / trials
+    done = 0
+    while done < trials:
+        n = min(batch_size, trials - done)
+        # Each opponent gets a distinct unseen card
+        keys = rng.random((n, len(remaining)))
+        drawn = np.argpartition(keys, opponents - 1, axis=1)[:, :opponents]
+        wins += int((~beaters[drawn].any(axis=1)).sum())
+        done += n
+
+        p = wins / done
+        stderr = np.sqrt(p * (1 - p) / done)
+        if tol is not None and stderr <= tol:
+            break
+
+    return p, float(stderr)
+
+
+def simulate_trick_outcome(card, hand, trump_suit, num_players, round_length, trials=100, tol=None, cache=win_cache):
+    # Probability of winning a trick, estimated by simulation and kept in `cache`
+    # (the shared win_cache by default; None always simulates)
+    if cache is not None:
+        return cached_simulate_trick_outcome(card, hand, trump_suit, num_players, round_length, trials, tol, cache)
+    return estimate_trick_win(card, hand, trump_suit, num_players, trials=trials, tol=tol)[0]
+
 
 def prob_win(card, hand, trump_suit, num_players, round_length):
     # Simplified probability calculation
@@ -62,7 +152,7 @@ def prob_win(card, hand, trump_suit, num_players, round_length):
         return 0.95  # Almost certain win
     elif card.rank == 'E':  # Jester
         return 0.05  # Almost certain loss
-    
+
     # For normal cards
     if trump_suit and card.suit == trump_suit:
         # Trump cards
@@ -0,0 +1,49 @@
+import random
+from pyFiles.round import Round
+from pyFiles.player import Player
+
+
+class Table:
+    # A reusable game table: one Round (with its deck and trick buffers), a
+    # seat list and a pool of baseline bots. Re-seating it for the next game
+    # reuses all of them instead of building new objects per game.
+
+    def __init__(self, num_baselines=20, profiler=None, recorder=None, baseline=Player):
+        # baseline: the class (or any callable taking a name) of the baseline bots
+        self.baselines = [baseline(f"Baseline{i}") for i in range(num_baselines)]
+        self.seats = []
+        self.round = Round(self.seats, 1, profiler=profiler, recorder=recorder)
+
+    def seat(self, players, round_number, baselines=0, random_baselines=False):
+        # Seats `players` followed by `baselines` baseline bots, all with a fresh bid/tricks count
+        seats = self.seats
+        seats.clear()
+        seats.extend(players)
+        if random_baselines:
+            seats.extend(random.sample(self.baselines, baselines))
+        else:
+            seats.extend(self.baselines[:baselines])
+        for p in seats:
+            p.reset()
+        self.round.round_number = round_number
+        return seats
+
+    def play(self, players, round_number, baselines=0, random_baselines=False):
+        # Plays one round; bids and tricks stay on the players until they are seated again
+        self.seat(players, round_number, baselines, random_baselines)
+        return self.round.play_round()
+
+    def play_deal(self, player, deal):
+        # Plays a pre-dealt round with `player` in the deal's seat and baselines elsewhere.
+        # Reseeding from the deal gives every player the same baseline decisions to start from.
+        if deal.num_players - 1 > len(self.baselines):
+            raise ValueError(f"{deal} needs {deal.num_players - 1} baselines, the table has {len(self.baselines)}")
+        seats = self.seats
+        seats.clear()
+        seats.extend(self.baselines[:deal.num_players - 1])
+        seats.insert(deal.seat, player)
+        for p in seats:
+            p.reset()
+        self.round.round_number = deal.round_number
+        random.seed(deal.seed)
+        return self.round.play_round(deal)
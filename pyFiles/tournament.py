@@ -0,0 +1,204 @@
+"""Head-to-head evaluation of player types on common deals.
+
+A tournament takes named player factories (player classes, or any callable
+taking a name; they must be picklable to run on a process pool, so use
+functools.partial rather than lambdas) and a GameSpec. Every entrant plays
+every pre-dealt round in the deal's seat against the same baseline bots,
+each round is scored with Round.calculate_scores (or the same rule in
+batch.simulate_rounds), and the result is one row per entrant and game.
+The summaries below turn it into the tables the validation functions and
+the app show.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pyFiles.player import Player
+from pyFiles.table import Table
+from pyFiles.deals import generate_deals, MAX_PLAYERS
+from pyFiles.bitboard import BitHand
+from pyFiles.batch import simulate_rounds, batchable
+from pyFiles.profiling import RoundProfiler
+
+
+class GameSpec:
+    # What a tournament plays: `games` random deals (table size from
+    # num_players, or 3-6 per game; rounds up to max_round) or the given
+    # deals, with `baseline` bots in the other seats
+
+    def __init__(self, games=1000, num_players=None, max_round=None, baseline=Player, seed=None, deals=None):
+        self.games = len(deals) if deals is not None else games
+        self.num_players = num_players
+        self.max_round = max_round
+        self.baseline = baseline
+        self.seed = seed
+        self.deals = deals
+
+    def make_deals(self):
+        if self.deals is not None:
+            if self.num_players is not None and any(d.num_players != self.num_players for d in self.deals):
+                raise ValueError(f"All deals must be for {self.num_players} players")
+            return list(self.deals)
+        return generate_deals(self.games, np.random.default_rng(self.seed), self.num_players,
+                              max_round=self.max_round)
+
+
+def _record(game, name, deal, bid, tricks, score):
+    dealt = BitHand(deal.hand_cards(deal.seat))
+    trump = deal.trump_card()
+    trump_suit = trump.suit if trump is not None else None
+    return {
+        "Game": game,
+        "Player": name,
+        "Seat": deal.seat,
+        "Round Number": deal.round_number,
+        "Num Players": deal.num_players,
+        "Bid": bid,
+        "Tricks Won": tricks,
+        "Score": score,
+        "Hit Bid": bid == tricks,
+        "Wizards": dealt.wizards,
+        "Jesters": dealt.jesters,
+        "Trump Cards": dealt.trumps(trump_suit),
+        "Non-Trump Cards": dealt.non_trumps(trump_suit),
+        "Trump Suit": trump_suit,
+    }
+
+
+def play_matches(entrants, games, baseline=Player, profiler=None):
+    # games: (game index, Deal) pairs. Returns one record per entrant and game.
+    players = [(name, factory(name)) for name, factory in entrants]
+    largest = max((deal.num_players for _, deal in games), default=MAX_PLAYERS)
+    table = Table(num_baselines=max(largest, MAX_PLAYERS) - 1, profiler=profiler, baseline=baseline)
+    records = []
+    for game, deal in games:
+        for name, player in players:
+            score = table.play_deal(player, deal)[name]
+            records.append(_record(game, name, deal, player.bid, player.tricks_won, score))
+    return records
+
+
+def play_matches_batched(entrants, groups, baseline=Player):
+    # groups: lists of (game index, Deal) pairs sharing table size, round number and seat,
+    # each simulated as one NumPy batch (see pyFiles/batch.py) from an RNG seeded by its deals
+    players = [(name, factory(name)) for name, factory in entrants]
+    records = []
+    for group in groups:
+        first = group[0][1]
+        baselines = [baseline(f"Baseline{i}") for i in range(first.num_players - 1)]
+        hands = np.array([deal.hands for _, deal in group])
+        trump = np.array([deal.trump for _, deal in group])
+        seeds = [deal.seed for _, deal in group]
+        for name, player in players:
+            table = baselines[:first.seat] + [player] + baselines[first.seat:]
+            result = simulate_rounds(table, first.round_number, len(group), np.random.default_rng(seeds),
+                                     hands, trump)
+            for (game, deal), bid, tricks, score in zip(group, result["bids"][:, first.seat],
+                                                       result["tricks"][:, first.seat],
+                                                       result["scores"][:, first.seat]):
+                records.append(_record(game, name, deal, int(bid), int(tricks), int(score)))
+    return records
+
+
+def _play_match_shard(entrants, games, baseline, profile=False):
+    # Runs in a worker process
+    profiler = RoundProfiler() if profile else None
+    return play_matches(entrants, games, baseline, profiler), profiler
+
+
+def _play_batch_shard(entrants, groups, baseline):
+    return play_matches_batched(entrants, groups, baseline), None
+
+
+def run_tournament(entrants, spec=None, workers=1, executor=None, profiler=None, batch=None):
+    """Plays every entrant on every deal of `spec` and returns a DataFrame of the games.
+
+    entrants maps names to player factories. With workers > 1 the deals are
+    split across a process pool (or `executor`); deals carry their own seeds,
+    so the results do not depend on the worker count. When every entrant and
+    the baseline are Player or EvolvedPlayer bots, rounds are simulated in
+    NumPy batches unless batch is False (or a profiler is given).
+    """
+    spec = spec if spec is not None else GameSpec()
+    entrants = list(entrants.items())
+    names = [name for name, _ in entrants]
+    if len(set(names)) != len(names) or any(name.startswith("Baseline") for name in names):
+        raise ValueError("Entrant names must be unique and not clash with the baseline bots")
+    games = list(enumerate(spec.make_deals()))
+    if batch is None:
+        batch = profiler is None and all(batchable(factory(name)) for name, factory in entrants) \
+            and batchable(spec.baseline("Baseline"))
+
+    if batch:
+        groups = {}
+        for game, deal in games:
+            groups.setdefault((deal.num_players, deal.round_number, deal.seat), []).append((game, deal))
+        tasks = list(groups.values())
+        shard = _play_batch_shard
+        shard_args = lambda part: (entrants, part, spec.baseline)
+    else:
+        tasks = games
+        shard = _play_match_shard
+        shard_args = lambda part: (entrants, part, spec.baseline, profiler is not None)
+
+    if workers <= 1:
+        if batch:
+            records = play_matches_batched(entrants, tasks, spec.baseline)
+        else:
+            records = play_matches(entrants, tasks, spec.baseline, profiler)
+    else:
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(shard, *shard_args(tasks[i::workers])) for i in range(workers)]
+            results = [f.result() for f in futures]
+        finally:
+            if own_executor:
+                executor.shutdown()
+        records = []
+        for shard_records, shard_profiler in results:
+            records.extend(shard_records)
+            if profiler is not None and shard_profiler is not None:
+                profiler.merge(shard_profiler)
+    order = {name: i for i, name in enumerate(names)}
+    records.sort(key=lambda r: (r["Game"], order[r["Player"]]))
+
+    return pd.DataFrame(records)
+
+
+def summarize(results):
+    # One row per entrant: average score and bid hit rate in percent
+    grouped = results.groupby("Player", sort=False)
+    return pd.DataFrame({
+        "Bot": list(grouped.groups),
+        "Avg Score": grouped["Score"].mean().to_numpy(),
+        "Hit Bid %": grouped["Hit Bid"].mean().to_numpy() * 100,
+    })
+
+
+def validation_summary(results, name):
+    # Avg score, hit rate and game count of one entrant as a Metric/Value table
+    games = results[results["Player"] == name]
+    return pd.DataFrame({
+        "Metric": ["Avg Score", "Hit Bid %", "Games"],
+        "Value": [f"{games['Score'].mean():.2f}", f"{games['Hit Bid'].mean():.2%}", f"{len(games)}"]
+    })
+
+
+def bid_frequencies(results, name):
+    # How often one entrant made each bid
+    bids = results.loc[results["Player"] == name, "Bid"]
+    bid_counts = bids.value_counts().sort_index().rename_axis(None)
+    bid_percentages = (bid_counts / len(bids) * 100).round(2)
+    return pd.DataFrame({
+        "Count": bid_counts,
+        "Percent": bid_percentages.astype(str) + "%"
+    })
+
+
+def bid_table(results):
+    # Every entrant's bids, one column per entrant
+    return pd.DataFrame({
+        name: pd.Series(games["Bid"].to_numpy())
+        for name, games in results.groupby("Player", sort=False)
+    })
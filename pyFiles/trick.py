@@ -0,0 +1,39 @@
+import numpy as np
+from pyFiles.deck import SUITS, SUIT_INDEX, NUM_CARDS, CARD_SUIT, CARD_RANK, IS_WIZARD, IS_JESTER
+
+# Trump/lead suits are indexed like Deck.suits, with one extra slot for "no suit"
+NO_SUIT_SLOT = len(SUITS)
+
+
+def suit_slot(suit):
+    return SUIT_INDEX.get(suit, NO_SUIT_SLOT)
+
+
+def _strength_row(trump, lead):
+    # Wizard > trump > lead suit > everything else (Jesters, off-suit cards).
+    # Equal strengths keep the earlier card, so the first Wizard wins.
+    row = np.zeros(NUM_CARDS, dtype=np.int8)
+    row[CARD_SUIT == lead] = 16 + CARD_RANK[CARD_SUIT == lead]
+    row[CARD_SUIT == trump] = 32 + CARD_RANK[CARD_SUIT == trump]
+    row[IS_JESTER] = 0
+    row[IS_WIZARD] = 48
+    return row
+
+
+# TRICK_STRENGTH_ARRAY[trump_slot, lead_slot, card_id] -> strength of that card in the trick
+TRICK_STRENGTH_ARRAY = np.array([
+    [_strength_row(trump, lead) for lead in range(NO_SUIT_SLOT + 1)]
+    for trump in range(NO_SUIT_SLOT + 1)
+])
+TRICK_STRENGTH = [[row.tolist() for row in per_trump] for per_trump in TRICK_STRENGTH_ARRAY]
+
+
+def resolve_trick(trick, lead_suit, trump_suit):
+    # trick is a list of (player_index, card) in play order; returns the winner's index
+    strength = TRICK_STRENGTH[suit_slot(trump_suit)][suit_slot(lead_suit)]
+    winner, best = trick[0][0], strength[trick[0][1].id]
+    for player_index, card in trick:
+        s = strength[card.id]
+        if s > best:
+            winner, best = player_index, s
+    return winner